@@ -0,0 +1 @@
+python benchmarks/bench_parse.py "$@"
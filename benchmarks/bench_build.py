@@ -0,0 +1,91 @@
+import argparse, json, os, subprocess, sys, tempfile, time
+
+import harness
+from gen_site import generate_site
+
+MAIN = os.path.join(harness.SRC_DIR, "main.py")
+SCALES = (1000, 10000, 100000)
+
+def tree_bytes(root):
+    total = 0
+    for dir_path, _, file_names in os.walk(root):
+        for name in file_names:
+            total += os.path.getsize(os.path.join(dir_path, name))
+    return total
+
+def run_build(site_dir, build_args):
+    """
+    Runs the full main() pipeline in a child process inside site_dir.
+
+    Returns:
+        A tuple (wall seconds, peak RSS in bytes) for the child.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, MAIN, *build_args],
+        cwd=site_dir,
+        stdout=subprocess.DEVNULL,
+    )
+    # wait4 gives the rusage of this child alone, unlike RUSAGE_CHILDREN
+    _, status, rusage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Build failed with exit code {process.returncode}")
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+    return elapsed, peak_rss
+
+def bench_scale(pages, build_args, root, seed=0):
+    site_dir = os.path.join(root, f"site-{pages}")
+    generate_site(site_dir, pages, seed)
+    elapsed, peak_rss = run_build(site_dir, build_args)
+    return {
+        "pages": pages,
+        "source_bytes": tree_bytes(os.path.join(site_dir, "content")),
+        "seconds": elapsed,
+        "pages_per_sec": pages / elapsed,
+        "us_per_page": elapsed / pages * 1e6,
+        "peak_rss": peak_rss,
+        "bytes_written": tree_bytes(os.path.join(site_dir, "docs")),
+    }
+
+def format_row(result, baseline):
+    growth = result["us_per_page"] / baseline["us_per_page"]
+    flag = "  <- superlinear" if growth > 1.5 else ""
+    return (
+        f"{result['pages']:>8}{result['seconds']:>10.2f}s{result['pages_per_sec']:>12.1f}"
+        f"{result['us_per_page']:>12.1f}{growth:>8.2f}x"
+        f"{result['peak_rss'] / 2**20:>10.1f}MB{result['bytes_written'] / 2**20:>12.1f}MB{flag}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end build scaling benchmark on synthetic sites")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=list(SCALES[:2]),
+        help=f"Page counts to build (default {SCALES[0]} {SCALES[1]}; add {SCALES[2]} for the full run)",
+    )
+    parser.add_argument("--output", default="benchmarks/results/build.json", help="Where to save the JSON results")
+    parser.add_argument("--workdir", default=None, help="Keep the generated sites here instead of a temporary directory")
+    parser.add_argument("build_args", nargs=argparse.REMAINDER, help="Arguments passed to main.py after --")
+    args = parser.parse_args()
+    build_args = [arg for arg in args.build_args if arg != "--"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.workdir or tmp
+        print(f"{'pages':>8}{'wall':>11}{'pages/s':>12}{'us/page':>12}{'growth':>9}{'peak RSS':>12}{'written':>14}")
+        results = []
+        for pages in sorted(args.scales):
+            result = bench_scale(pages, build_args, root)
+            results.append(result)
+            print(format_row(result, results[0]), flush=True)
+
+    target_dir = os.path.dirname(args.output)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"build_args": build_args, "results": results}, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
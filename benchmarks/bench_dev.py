@@ -0,0 +1,83 @@
+import argparse, http.client, json, os, shutil, tempfile, time
+
+import harness
+from bench_server import start_server
+
+REPO_DIR = os.path.dirname(harness.SRC_DIR)
+
+def fetch(port, path):
+    """
+    Returns:
+        Milliseconds until the first byte of the response, and until its last
+    """
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    start = time.perf_counter()
+    conn.request("GET", path)
+    response = conn.getresponse()
+    first_byte = time.perf_counter()
+    response.read()
+    done = time.perf_counter()
+    conn.close()
+    return (first_byte - start) * 1e3, (done - start) * 1e3
+
+def summarize(samples):
+    first_bytes = sorted(sample[0] for sample in samples)
+    totals = sorted(sample[1] for sample in samples)
+    return {
+        "requests": len(samples),
+        "first_byte_p50_ms": first_bytes[len(first_bytes) // 2],
+        "first_byte_max_ms": first_bytes[-1],
+        "total_p50_ms": totals[len(totals) // 2],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of server.py --dev: a page right after its markdown is saved, and unchanged")
+    parser.add_argument("--output", default="benchmarks/results/dev.json", help="Where to save the JSON results")
+    parser.add_argument("--saves", type=int, default=50, help="Edits of the page to time")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(os.path.join(REPO_DIR, "content"), os.path.join(directory, "content"))
+        shutil.copytree(os.path.join(REPO_DIR, "static"), os.path.join(directory, "static"))
+        shutil.copy(os.path.join(REPO_DIR, "template.html"), directory)
+        md_path = os.path.join(directory, "content", "index.md")
+        with open(md_path) as f:
+            source_md = f.read()
+
+        process, port = start_server(directory, [
+            "--dev",
+            "--content", os.path.join(directory, "content"),
+            "--static", os.path.join(directory, "static"),
+            "--template", os.path.join(directory, "template.html"),
+        ])
+        try:
+            fetch(port, "/") # warm up imports and the template
+            after_save = []
+            unchanged = []
+            for i in range(args.saves):
+                with open(md_path, "w") as f:
+                    f.write(source_md + f"\nEdit {i}\n")
+                after_save.append(fetch(port, "/"))
+                unchanged.append(fetch(port, "/"))
+        finally:
+            process.terminate()
+            process.wait()
+
+    for name, samples in {"after_save": after_save, "unchanged": unchanged}.items():
+        results[name] = summarize(samples)
+        print(
+            f"{name:<16}{results[name]['first_byte_p50_ms']:>10.2f} ms first byte p50"
+            f"{results[name]['first_byte_max_ms']:>10.2f} ms max{results[name]['total_p50_ms']:>10.2f} ms total p50",
+            flush=True,
+        )
+
+    target_dir = os.path.dirname(args.output)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse, gc, json, os, subprocess, sys, tracemalloc
+
+import harness
+from inputs import markdown_document
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from parse import markdown_to_html_node
+from textnode import TextNode, TextType
+
+NODE_COUNT = 100000
+
+# Every node shares the same strings, so only the nodes themselves (and
+# any dict or list they own) are measured.
+NODE_FACTORIES = {
+    "TextNode": lambda: TextNode("text", TextType.BOLD),
+    "TextNode(link)": lambda: TextNode("text", TextType.LINK, "/url"),
+    "LeafNode": lambda: LeafNode("b", "text"),
+    "LeafNode(props)": lambda: LeafNode("a", "text", {"href": "/url"}),
+    "ParentNode": lambda: ParentNode("p", []),
+}
+
+def traced_bytes(build):
+    """
+    Returns (bytes still allocated, peak bytes) while build() runs, with
+    build's result kept alive until measured.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current - start, peak - start
+
+def bytes_per_node(factory, count):
+    indexes = range(count)
+    allocated, _ = traced_bytes(lambda: [factory() for _ in indexes])
+    list_only, _ = traced_bytes(lambda: [None for _ in indexes])
+    return (allocated - list_only) / count
+
+def document_memory(paragraphs):
+    document = markdown_document(paragraphs, seed=0)
+    retained, peak = traced_bytes(lambda: markdown_to_html_node(document))
+    return {"paragraphs": paragraphs, "chars": len(document), "retained": retained, "peak": peak}
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per node and peak memory of parsing a large document")
+    parser.add_argument("--output", default="benchmarks/results/memory.json", help="Where to save the JSON results")
+    parser.add_argument("--nodes", type=int, default=NODE_COUNT, help="Nodes allocated per node type")
+    parser.add_argument("--blocks", type=int, default=100000, help="Blocks in the parsed document")
+    parser.add_argument("--rev", help="First measure the tree as of this git revision, saving next to --output")
+    args = parser.parse_args()
+
+    if args.rev:
+        rev_output = f"{os.path.splitext(args.output)[0]}-{args.rev}.json"
+        print(f"== {args.rev} ==", flush=True)
+        with harness.checkout(args.rev) as tree:
+            # A fresh interpreter, so the old modules are imported instead of ours
+            subprocess.run(
+                [sys.executable, __file__, "--output", rev_output, "--nodes", str(args.nodes), "--blocks", str(args.blocks)],
+                env={**os.environ, "BENCH_SRC_DIR": os.path.join(tree, "src")},
+                check=True,
+            )
+        print("== working tree ==")
+
+    results = {"nodes": {}, "document": None}
+    for name, factory in NODE_FACTORIES.items():
+        size = bytes_per_node(factory, args.nodes)
+        results["nodes"][name] = size
+        print(f"{name:<20}{size:>10.1f} bytes/node")
+
+    document = document_memory(args.blocks)
+    results["document"] = document
+    print(
+        f"markdown_to_html_node({document['paragraphs']} blocks, {document['chars'] / 2**20:.1f}MB): "
+        f"{document['retained'] / 2**20:.1f}MB retained, {document['peak'] / 2**20:.1f}MB peak"
+    )
+
+    target_dir = os.path.dirname(args.output)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
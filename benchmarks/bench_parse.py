@@ -0,0 +1,134 @@
+import argparse, random
+
+import harness
+from inputs import inline_text, link_dense_document, markdown_block, markdown_document
+
+from blocks import block_to_block_type, scan_blocks
+from parse import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+    markdown_to_blocks,
+    markdown_to_html_node,
+)
+from leafnode import LeafNode
+from textnode import TextNode, TextType
+
+SIZES = (10, 100, 1000)          # words per line of inline text
+DENSITIES = (0.0, 0.1, 0.3)      # share of words carrying inline markup
+DOCUMENT_SIZES = (10, 100, 1000) # blocks per document
+
+def inline_cases(sizes, densities):
+    for words in sizes:
+        for density in densities:
+            text = inline_text(words, density, seed=words)
+            params = {"words": words, "density": density, "chars": len(text)}
+            nodes = [TextNode(text, TextType.TEXT)]
+            suffix = f"[words={words},density={density}]"
+            yield (
+                f"split_nodes_delimiter(**){suffix}",
+                lambda nodes=nodes: split_nodes_delimiter(nodes, "**", TextType.BOLD),
+                params,
+            )
+            yield (
+                f"split_nodes_image{suffix}",
+                lambda nodes=nodes: split_nodes_image(nodes),
+                params,
+            )
+            yield (
+                f"split_nodes_link{suffix}",
+                lambda nodes=nodes: split_nodes_link(nodes),
+                params,
+            )
+            yield (
+                f"text_to_textnodes{suffix}",
+                lambda text=text: text_to_textnodes(text),
+                params,
+            )
+
+def block_cases(line_counts):
+    rng = random.Random(0)
+    for kind in ("heading", "code", "quote", "unordered_list", "ordered_list", "paragraph"):
+        for lines in line_counts:
+            block = markdown_block(kind, lines, 0.1, rng)
+            yield (
+                f"block_to_block_type[{kind},lines={lines}]",
+                lambda block=block: block_to_block_type(block),
+                {"kind": kind, "lines": lines, "chars": len(block)},
+            )
+
+def document_cases(sizes):
+    for blocks in sizes:
+        document = markdown_document(blocks, seed=blocks)
+        yield (
+            f"markdown_to_blocks[blocks={blocks}]",
+            lambda document=document: markdown_to_blocks(document),
+            {"blocks": blocks, "chars": len(document)},
+        )
+        yield (
+            f"scan_blocks[blocks={blocks}]",
+            lambda document=document: list(scan_blocks(document.split("\n"))),
+            {"blocks": blocks, "chars": len(document)},
+        )
+        # Rendering an already parsed tree, with its TextNodes lowered
+        tree = markdown_to_html_node(document)
+        yield (
+            f"to_html[blocks={blocks}]",
+            lambda tree=tree: tree.to_html(),
+            {"blocks": blocks, "chars": len(document)},
+        )
+
+        # Pages of links and images, where nearly every node has props
+        links = link_dense_document(blocks, seed=blocks)
+        yield (
+            f"markdown_to_html_node[link_dense,blocks={blocks}]",
+            lambda links=links: markdown_to_html_node(links),
+            {"blocks": blocks, "chars": len(links)},
+        )
+        link_tree = markdown_to_html_node(links)
+        yield (
+            f"to_html[link_dense,blocks={blocks}]",
+            lambda link_tree=link_tree: link_tree.to_html(),
+            {"blocks": blocks, "chars": len(links)},
+        )
+        # A one-shot build parses and renders each tree once
+        yield (
+            f"build[link_dense,blocks={blocks}]",
+            lambda links=links: markdown_to_html_node(links).to_html(),
+            {"blocks": blocks, "chars": len(links)},
+        )
+
+def node_cases(counts):
+    for count in counts:
+        urls = [f"/posts/{i % 50}/" for i in range(count)]
+        yield (
+            f"link_nodes[construct+render,nodes={count}]",
+            lambda urls=urls: [LeafNode("a", "x", {"href": url}).to_html() for url in urls],
+            {"nodes": count},
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the markdown parsing primitives")
+    parser.add_argument("--output", default="benchmarks/results/parse.json", help="Where to save the JSON results")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing run")
+    parser.add_argument("--quick", action="store_true", help="Only run the two smallest sizes")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    args = parser.parse_args()
+
+    sizes = SIZES[:2] if args.quick else SIZES
+    cases = [
+        *inline_cases(sizes, DENSITIES),
+        *block_cases((1, 10, 100)[:len(sizes)]),
+        *document_cases(DOCUMENT_SIZES[:len(sizes)]),
+        *node_cases((100, 1000, 10000)[:len(sizes)]),
+    ]
+    cases = [case for case in cases if args.filter in case[0]]
+
+    results = harness.run_benchmarks(cases, repeat=args.repeat, min_seconds=args.min_time)
+    harness.save_results(results, args.output, "parse")
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
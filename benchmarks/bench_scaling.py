@@ -0,0 +1,99 @@
+import argparse, sys
+
+import harness
+from inputs import inline_text
+
+from blocks import block_to_block_type, scan_blocks
+from leafnode import LeafNode
+from parentnode import ParentNode
+from parse import markdown_to_html_node, text_to_textnodes
+
+SIZES = (1000, 10000, 100000, 1000000) # input length in characters
+GROWTH_LIMIT = 2.0            # allowed growth of ns/char from the smallest size
+
+def repeat_to(unit, chars):
+    return unit * max(1, chars // len(unit))
+
+def nested_spans(chars):
+    # Each level renders as "<span></span>" (13 chars) around the leaf
+    node = LeafNode("b", "x")
+    for _ in range(max(1, chars // 13)):
+        node = ParentNode("span", [node])
+    return node
+
+# (family, input builder taking a length in chars, function under test)
+FAMILIES = [
+    ("inline/plain", lambda chars: inline_text(chars // 6, 0.0, seed=1), text_to_textnodes),
+    ("inline/dense", lambda chars: inline_text(chars // 8, 0.5, seed=1), text_to_textnodes),
+    ("inline/nested", lambda chars: repeat_to("_a **b [c `d` e](/u) f** g_ ", chars), text_to_textnodes),
+    ("inline/unclosed_openers", lambda chars: repeat_to("[_**", chars), text_to_textnodes),
+    ("inline/alternating_delimiters", lambda chars: repeat_to("_**", chars), text_to_textnodes),
+    ("inline/unclosed_brackets", lambda chars: repeat_to("![a](", chars), text_to_textnodes),
+    ("inline/stray_closers", lambda chars: repeat_to("[a] ](x) ", chars), text_to_textnodes),
+    ("blocks/unterminated_fence", lambda chars: "```py\n" + repeat_to("x = 1\n", chars), block_to_block_type),
+    ("blocks/blank_line_fence", lambda chars: "```\n" + "\n" * chars + "x", block_to_block_type),
+    ("blocks/heading_whitespace", lambda chars: "#" + " " * chars + "x\ny", block_to_block_type),
+    ("blocks/long_list", lambda chars: repeat_to("- item\n", chars), block_to_block_type),
+    ("blocks/long_ordered_list", lambda chars: "\n".join(f"{i}. item" for i in range(1, chars // 8 + 1)), block_to_block_type),
+    ("blocks/quote_run", lambda chars: repeat_to("> quoted line\n", chars), block_to_block_type),
+    ("scan/unterminated_fence", lambda chars: "```\n" + repeat_to("code\n\n", chars), lambda md: list(scan_blocks(md.split("\n")))),
+    ("document/long_list", lambda chars: repeat_to("- item **b**\n", chars), markdown_to_html_node),
+    ("document/quote_run", lambda chars: repeat_to("> quoted line\n", chars), markdown_to_html_node),
+    ("document/unterminated_fence", lambda chars: "```\n" + repeat_to("x = 1\n\n", chars), markdown_to_html_node),
+    ("render/nesting_depth", nested_spans, lambda node: node.to_html()),
+]
+
+def run_family(name, make_input, func, sizes, repeat, min_seconds):
+    results = []
+    for chars in sizes:
+        data = make_input(chars)
+        # Node trees are measured by the requested size, roughly their html length
+        size = len(data) if isinstance(data, str) else chars
+        result = harness.bench(
+            f"{name}[chars={chars}]",
+            lambda data=data: func(data),
+            repeat=repeat,
+            min_seconds=min_seconds,
+            params={"family": name, "chars": size},
+        )
+        result["ns_per_char"] = result["ns_per_op_min"] / size
+        results.append(result)
+    return results
+
+def format_row(result, baseline):
+    growth = result["ns_per_char"] / baseline["ns_per_char"]
+    flag = "  <- superlinear" if growth > GROWTH_LIMIT else ""
+    return f"{result['name']:<52}{result['ns_per_op_min'] / 1e6:>12.3f} ms{result['ns_per_char']:>10.1f} ns/char{growth:>8.2f}x{flag}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Checks that parsing and rendering time grow linearly with input size, on normal and pathological inputs")
+    parser.add_argument("--output", default="benchmarks/results/scaling.json", help="Where to save the JSON results")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Input lengths in characters")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timing run")
+    parser.add_argument("--filter", default="", help="Only run families whose name contains this text")
+    parser.add_argument("--check", action="store_true", help=f"Exit with status 1 if ns/char grows more than {GROWTH_LIMIT}x")
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes)
+    all_results = []
+    superlinear = []
+    for name, make_input, func in FAMILIES:
+        if args.filter not in name:
+            continue
+        results = run_family(name, make_input, func, sizes, args.repeat, args.min_time)
+        for result in results:
+            print(format_row(result, results[0]), flush=True)
+            if result["ns_per_char"] / results[0]["ns_per_char"] > GROWTH_LIMIT:
+                superlinear.append(result["name"])
+        all_results.extend(results)
+
+    harness.save_results(all_results, args.output, "scaling")
+    print(f"Results written to {args.output}")
+    if superlinear:
+        print(f"Superlinear: {', '.join(superlinear)}")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
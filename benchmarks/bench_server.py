@@ -0,0 +1,147 @@
+import argparse, contextlib, http.client, json, os, socket, subprocess, sys, tempfile, threading, time
+
+import harness
+
+SERVER = os.path.join(os.path.dirname(harness.SRC_DIR), "server.py")
+PAGE = b"<!DOCTYPE html><html><body>" + b"<p>Lorem ipsum dolor sit amet.</p>" * 200 + b"</body></html>"
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(directory, server_args, server=SERVER):
+    """
+    Starts server.py (or another revision's copy of it) in a child process
+    and waits until it accepts connections.
+
+    Returns:
+        A tuple (process, port)
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, server, "--dir", directory, "--port", str(port), *server_args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, port
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("server.py did not start")
+            time.sleep(0.05)
+
+def client(port, requests, keep_alive, revalidate, latencies):
+    conn = None
+    headers = {}
+    for _ in range(requests):
+        if conn is None:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        start = time.perf_counter()
+        conn.request("GET", "/index.html", headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if revalidate and response.getheader("ETag"):
+            # Like a browser with the page cached: later requests get 304s
+            headers = {"If-None-Match": response.getheader("ETag")}
+        if not keep_alive or response.will_close:
+            conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+
+def stall(port, seconds):
+    # A client that connects and then sends nothing, like a slow mobile link
+    with socket.create_connection(("127.0.0.1", port)):
+        time.sleep(seconds)
+
+def run_load(port, clients, requests, keep_alive, stall_seconds, revalidate=False):
+    latencies = []
+    threads = [
+        threading.Thread(target=client, args=(port, requests, keep_alive, revalidate, latencies))
+        for _ in range(clients)
+    ]
+    staller = None
+    if stall_seconds:
+        staller = threading.Thread(target=stall, args=(port, stall_seconds))
+        staller.start()
+        time.sleep(0.1) # let the stalled connection be accepted first
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if staller is not None:
+        staller.join()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1e3,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/sec of server.py: single-threaded, worker pool, file cache and 304s")
+    parser.add_argument("--output", default="benchmarks/results/server.json", help="Where to save the JSON results")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per client")
+    parser.add_argument("--workers", type=int, default=8, help="Workers of the pooled server")
+    parser.add_argument("--stall", type=float, default=1.0, help="Seconds the stalled client holds its connection")
+    parser.add_argument("--baseline", metavar="REV", help="Also run server.py as of this git revision, e.g. the plain HTTPServer before the worker pool")
+    args = parser.parse_args()
+
+    # name -> (server.py path, extra arguments)
+    servers = {
+        "single": (SERVER, ["--workers", "0"]),
+        f"pool[workers={args.workers},no_cache]": (SERVER, ["--workers", str(args.workers), "--cache-mb", "0"]),
+        f"pool[workers={args.workers}]": (SERVER, ["--workers", str(args.workers)]),
+    }
+    scenarios = {
+        "close": {"keep_alive": False, "stall_seconds": 0},
+        "keep_alive": {"keep_alive": True, "stall_seconds": 0},
+        "stalled_client": {"keep_alive": True, "stall_seconds": args.stall},
+        "revalidate": {"keep_alive": True, "stall_seconds": 0, "revalidate": True},
+    }
+
+    results = {}
+    with contextlib.ExitStack() as stack:
+        if args.baseline:
+            old_tree = stack.enter_context(harness.checkout(args.baseline))
+            # Older revisions only take --dir and --port
+            servers = {f"baseline[{args.baseline}]": (os.path.join(old_tree, "server.py"), []), **servers}
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        with open(os.path.join(directory, "index.html"), "wb") as f:
+            f.write(PAGE)
+        for server_name, (server, server_args) in servers.items():
+            process, port = start_server(directory, server_args, server)
+            try:
+                for scenario_name, scenario in scenarios.items():
+                    result = run_load(port, args.clients, args.requests, **scenario)
+                    name = f"{server_name}/{scenario_name}"
+                    results[name] = result
+                    print(
+                        f"{name:<40}{result['requests_per_sec']:>10,.0f} req/s"
+                        f"{result['p50_ms']:>10.2f} ms p50{result['p99_ms']:>10.2f} ms p99",
+                        flush=True,
+                    )
+            finally:
+                process.terminate()
+                process.wait()
+
+    target_dir = os.path.dirname(args.output)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
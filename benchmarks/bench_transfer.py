@@ -0,0 +1,92 @@
+import argparse, http.client, json, os, tempfile, threading, time
+
+from bench_server import start_server
+
+def download(port, downloads, range_header, received):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    headers = {"Range": range_header} if range_header else {}
+    total = 0
+    for _ in range(downloads):
+        conn.request("GET", "/asset.bin", headers=headers)
+        response = conn.getresponse()
+        while True:
+            chunk = response.read(1 << 20)
+            if not chunk:
+                break
+            total += len(chunk)
+    conn.close()
+    received.append(total)
+
+def run_transfer(port, clients, downloads, size, split):
+    """
+    Has each client download the file `downloads` times, or with split
+    its own 1/clients slice of it through a Range request, like a
+    download manager fetching parts in parallel.
+
+    Returns:
+        Megabytes per second received over all clients
+    """
+    received = []
+    threads = []
+    for i in range(clients):
+        range_header = None
+        if split:
+            part = size // clients
+            start = i * part
+            stop = size if i == clients - 1 else start + part
+            range_header = f"bytes={start}-{stop - 1}"
+        threads.append(threading.Thread(target=download, args=(port, downloads, range_header, received)))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(received) / 2**20 / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="MB/s of large file downloads from server.py, with and without sendfile")
+    parser.add_argument("--output", default="benchmarks/results/transfer.json", help="Where to save the JSON results")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the downloaded file")
+    parser.add_argument("--downloads", type=int, default=4, help="Downloads per client")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per benchmark; the best is kept")
+    args = parser.parse_args()
+
+    size = args.size_mb * 2**20
+    servers = {
+        "copy": ["--no-sendfile"],
+        "sendfile": [],
+    }
+    scenarios = {
+        "1_client": {"clients": 1, "downloads": args.downloads, "split": False},
+        "4_clients": {"clients": 4, "downloads": args.downloads, "split": False},
+        "4_ranges": {"clients": 4, "downloads": args.downloads, "split": True},
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "asset.bin"), "wb") as f:
+            f.write(os.urandom(size))
+        for server_name, server_args in servers.items():
+            process, port = start_server(directory, server_args)
+            try:
+                for scenario_name, scenario in scenarios.items():
+                    name = f"{server_name}/{scenario_name}"
+                    mb_per_sec = max(
+                        run_transfer(port, size=size, **scenario) for _ in range(args.repeat)
+                    )
+                    results[name] = {"size": size, "mb_per_sec": mb_per_sec, **scenario}
+                    print(f"{name:<28}{mb_per_sec:>10,.0f} MB/s", flush=True)
+            finally:
+                process.terminate()
+                process.wait()
+
+    target_dir = os.path.dirname(args.output)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse, sys
+
+import harness
+
+def compare(baseline, candidate, threshold=5.0):
+    """
+    Returns report lines comparing two results files benchmark by
+    benchmark. A change smaller than threshold percent, or smaller than
+    the combined stdev of both runs, is reported as noise.
+    """
+    lines = []
+    old = baseline["results"]
+    new = candidate["results"]
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            lines.append(f"{name:<48}{'only in ' + ('candidate' if name in new else 'baseline'):>30}")
+            continue
+        a, b = old[name], new[name]
+        change = (b["ns_per_op"] - a["ns_per_op"]) / a["ns_per_op"] * 100
+        noise = a["ns_per_op_stdev"] + b["ns_per_op_stdev"]
+        if abs(change) < threshold or abs(b["ns_per_op"] - a["ns_per_op"]) <= noise:
+            verdict = "~"
+        elif change < 0:
+            verdict = "faster"
+        else:
+            verdict = "SLOWER"
+        lines.append(
+            f"{name:<48}{a['ns_per_op']:>14,.0f}{b['ns_per_op']:>14,.0f} ns/op {change:>+8.1f}%  {verdict}"
+        )
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline", help="Results JSON from the reference run")
+    parser.add_argument("candidate", help="Results JSON from the run to check")
+    parser.add_argument("--threshold", type=float, default=5.0, help="Percent change treated as noise")
+    args = parser.parse_args()
+
+    lines = compare(harness.load_results(args.baseline), harness.load_results(args.candidate), args.threshold)
+    print("\n".join(lines))
+    if any(line.endswith("SLOWER") for line in lines):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse, os, random, shutil
+
+import harness
+from inputs import inline_text, markdown_document
+
+REPO_DIR = os.path.dirname(harness.SRC_DIR)
+SECTIONS = ("blog", "docs", "guides", "reference", "news", "wiki")
+
+def page_dir(rng, index):
+    """
+    Picks a directory for a page, 1 to 4 levels deep, e.g.
+    blog/2021/07/post-42 or reference/api/post-7.
+    """
+    section = rng.choice(SECTIONS)
+    depth = rng.choices((1, 2, 3, 4), (10, 30, 40, 20))[0]
+    parts = [section]
+    if depth >= 2:
+        parts.append(str(rng.randint(2015, 2025)))
+    if depth >= 3:
+        parts.append(f"{rng.randint(1, 12):02d}")
+    if depth >= 4:
+        parts.append(rng.choice(("part-a", "part-b", "part-c")))
+    parts.append(f"post-{index}")
+    return os.path.join(*parts)
+
+def page_markdown(rng, index, links, images):
+    """
+    Returns one page: a title, a back link, an image and a body drawn
+    from the benchmark block mix.
+    """
+    seed = rng.randrange(1 << 30)
+    lines = [f"# Page {index} {inline_text(4, 0, seed)}", "", "[< Back Home](/)", ""]
+    if rng.random() < images:
+        lines += [f"![Illustration {index}](/images/{rng.choice(('tom', 'glorfindel', 'rivendell', 'tolkien'))}.png)", ""]
+    blocks = rng.randint(5, 40)
+    lines.append(markdown_document(blocks, density=links, seed=seed))
+    return "\n".join(lines) + "\n"
+
+def generate_site(root, pages, seed=0, links=0.1, images=0.5):
+    """
+    Writes a synthetic site (content/, static/ and template.html) with
+    `pages` markdown pages under root. The same seed always produces the
+    same tree.
+    """
+    rng = random.Random(seed)
+    content_dir = os.path.join(root, "content")
+    if os.path.exists(content_dir):
+        shutil.rmtree(content_dir)
+    os.makedirs(content_dir)
+
+    with open(os.path.join(content_dir, "index.md"), "w") as f:
+        f.write(page_markdown(rng, 0, links, images))
+    for index in range(1, pages):
+        dir_path = os.path.join(content_dir, page_dir(rng, index))
+        os.makedirs(dir_path, exist_ok=True)
+        with open(os.path.join(dir_path, "index.md"), "w") as f:
+            f.write(page_markdown(rng, index, links, images))
+
+    static_dir = os.path.join(root, "static")
+    if os.path.exists(static_dir):
+        shutil.rmtree(static_dir)
+    shutil.copytree(os.path.join(REPO_DIR, "static"), static_dir)
+    shutil.copy2(os.path.join(REPO_DIR, "template.html"), os.path.join(root, "template.html"))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic site for build benchmarks")
+    parser.add_argument("root", help="Directory to write content/, static/ and template.html into")
+    parser.add_argument("--pages", type=int, default=1000, help="Number of pages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--links", type=float, default=0.1, help="Share of words carrying inline markup")
+    parser.add_argument("--images", type=float, default=0.5, help="Share of pages with a header image")
+    args = parser.parse_args()
+
+    generate_site(args.root, args.pages, args.seed, args.links, args.images)
+    print(f"Wrote {args.pages} pages to {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Timing harness shared by the benchmark scripts: timeit-based runs
+# reported as ns/op and ops/sec, saved as JSON for compare.py.
+import contextlib, io, json, os, platform, statistics, subprocess, sys, tarfile, tempfile, time, timeit
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# BENCH_SRC_DIR points the benchmarks at another tree's src, e.g. one
+# extracted with checkout() below
+SRC_DIR = os.environ.get("BENCH_SRC_DIR") or os.path.join(REPO_DIR, "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+@contextlib.contextmanager
+def checkout(rev):
+    """
+    Extracts the tree of a git revision into a temporary directory, so a
+    benchmark can run the code as it was before a change.
+
+    Yields:
+        The path of the extracted tree
+    """
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev],
+        cwd=REPO_DIR, check=True, capture_output=True,
+    ).stdout
+    with tempfile.TemporaryDirectory() as directory:
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(directory, filter="data")
+        yield directory
+
+def autorange(func, min_seconds=0.05):
+    """
+    Returns a loop count that makes one timing run last at least
+    min_seconds, so very fast operations are not lost in timer noise.
+    """
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_seconds:
+            return number
+        number *= 2 if elapsed == 0 else max(2, int(min_seconds / elapsed * 1.2))
+
+def bench(name, func, repeat=5, min_seconds=0.05, params=None):
+    """
+    Times func() and returns a result dict.
+
+    Args:
+        name: The benchmark name, used as its key in the results file.
+        func: A zero-argument callable running one operation.
+        repeat: How many timing runs to take.
+        min_seconds: The minimum duration of a single run.
+        params: Optional dict describing the input (size, density, ...).
+    """
+    number = autorange(func, min_seconds)
+    runs = [t / number * 1e9 for t in timeit.repeat(func, number=number, repeat=repeat)]
+    mean = statistics.fmean(runs)
+    stdev = statistics.stdev(runs) if len(runs) > 1 else 0.0
+    return {
+        "name": name,
+        "params": params or {},
+        "number": number,
+        "repeat": repeat,
+        "ns_per_op": mean,
+        "ns_per_op_min": min(runs),
+        "ns_per_op_stdev": stdev,
+        "ops_per_sec": 1e9 / mean if mean else 0.0,
+    }
+
+def format_result(result):
+    mean = result["ns_per_op"]
+    spread = result["ns_per_op_stdev"] / mean * 100 if mean else 0.0
+    return (
+        f"{result['name']:<48}{mean:>14,.0f} ns/op ±{spread:>5.1f}%"
+        f"{result['ops_per_sec']:>14,.1f} ops/s"
+    )
+
+def run_benchmarks(cases, repeat=5, min_seconds=0.05, stream=None):
+    """
+    Runs (name, func, params) cases in order, printing each result as it
+    completes, and returns the list of result dicts.
+    """
+    stream = stream or sys.stdout
+    results = []
+    for name, func, params in cases:
+        result = bench(name, func, repeat=repeat, min_seconds=min_seconds, params=params)
+        print(format_result(result), file=stream, flush=True)
+        results.append(result)
+    return results
+
+def save_results(results, path, suite):
+    target_dir = os.path.dirname(path)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+    data = {
+        "suite": suite,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {result["name"]: result for result in results},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,86 @@
+# Seeded input generators, so every run benchmarks exactly the same text.
+import random
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog middle earth ring bearer "
+    "wizard hobbit shire river forest mountain song elder star road"
+).split()
+
+URLS = ("/", "/blog/tom", "/images/tom.png", "https://www.boot.dev", "/contact")
+
+def inline_text(words, density, seed=0):
+    """
+    Returns a single line of `words` words where roughly `density` of the
+    words are turned into inline markup (bold, italic, code, link, image).
+    Delimiters are always balanced, so every splitter accepts the text.
+    """
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < density:
+            kind = rng.randrange(5)
+            if kind == 0:
+                word = f"**{word}**"
+            elif kind == 1:
+                word = f"_{word}_"
+            elif kind == 2:
+                word = f"`{word}`"
+            elif kind == 3:
+                word = f"[{word}]({rng.choice(URLS)})"
+            else:
+                word = f"![{word}]({rng.choice(URLS)})"
+        parts.append(word)
+    return " ".join(parts)
+
+def markdown_block(kind, lines, density, rng):
+    seed = rng.randrange(1 << 30)
+    if kind == "heading":
+        return "#" * rng.randint(1, 6) + " " + inline_text(6, 0, seed)
+    if kind == "code":
+        body = "\n".join(inline_text(8, 0, seed + i) for i in range(lines))
+        return f"```\n{body}\n```"
+    if kind == "quote":
+        return "\n".join("> " + inline_text(10, 0, seed + i) for i in range(lines))
+    if kind == "unordered_list":
+        return "\n".join("- " + inline_text(8, density, seed + i) for i in range(lines))
+    if kind == "ordered_list":
+        return "\n".join(f"{i + 1}. " + inline_text(8, density, seed + i) for i in range(lines))
+    return "\n".join(inline_text(12, density, seed + i) for i in range(lines))
+
+BLOCK_MIX = (
+    ("paragraph", 50),
+    ("heading", 15),
+    ("unordered_list", 12),
+    ("ordered_list", 8),
+    ("quote", 8),
+    ("code", 7),
+)
+
+def markdown_document(blocks, density=0.1, seed=0, max_lines=6):
+    """
+    Returns a markdown document of `blocks` blocks drawn from BLOCK_MIX.
+    """
+    rng = random.Random(seed)
+    kinds = [kind for kind, _ in BLOCK_MIX]
+    weights = [weight for _, weight in BLOCK_MIX]
+    out = []
+    for _ in range(blocks):
+        kind = rng.choices(kinds, weights)[0]
+        out.append(markdown_block(kind, rng.randint(1, max_lines), density, rng))
+    return "\n\n".join(out)
+
+def link_dense_document(blocks, links=12, seed=0):
+    """
+    Returns `blocks` paragraphs made of `links` links and images each, all
+    pointing at the few URLS, like a navigation page or an image gallery.
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(blocks):
+        parts = []
+        for _ in range(links):
+            prefix = "!" if rng.random() < 0.3 else ""
+            parts.append(f"{prefix}[{rng.choice(WORDS)}]({rng.choice(URLS)})")
+        out.append(" ".join(parts))
+    return "\n\n".join(out)
@@ -1,9 +1,223 @@
 import os
+import io
+import sys
 import argparse
+import datetime
+import email.utils
+import hashlib
+import re
+import secrets
+import functools
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 
+# The site generator's modules, which only --dev needs
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_KEEPALIVE_TIMEOUT = 5 # seconds an idle keep-alive connection holds a worker
+DEFAULT_CACHE_BYTES = 32 * 2**20
+DEFAULT_CACHE_FILE_BYTES = 2**20 # larger files are always read from disk
+
+# Precompressed copies written next to the files by the build's --gzip
+# stage. They carry their source's mtime while they're current.
+GZIP_SUFFIX = ".gz"
+# Only these types can have a sidecar, so images cost no extra stat
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+# More ranges than this in one request are ignored and the whole file sent
+MAX_RANGES = 16
+RANGE_SPEC_REGEX = re.compile(r"([0-9]*)-([0-9]*)")
+
+# Sent as-is to connections over the limit, without parsing their request
+BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Length: 0\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"\r\n"
+)
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header value allows a gzip response.
+    An explicit gzip entry wins over "*"; q=0 refuses the coding.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in accepted:
+            return accepted[coding] > 0
+    return False
+
+
+def parse_range(range_header, size):
+    """
+    Parses a Range header against a file of size bytes.
+
+    Returns:
+        A list of (start, stop) byte offsets, stop exclusive, of the
+        satisfiable ranges in request order. The list is empty when no
+        range is satisfiable (a 416). None means the header is malformed,
+        not in bytes, or asks for too many ranges, and should be ignored.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    ranges = []
+    specs = spec.split(",")
+    if len(specs) > MAX_RANGES:
+        return None
+    for part in specs:
+        match = RANGE_SPEC_REGEX.fullmatch(part.strip())
+        if match is None or match.group() == "-":
+            return None
+        first, last = match.groups()
+        if not first:
+            # "-n" is the last n bytes
+            suffix = int(last)
+            if suffix > 0 and size > 0:
+                ranges.append((max(0, size - suffix), size))
+            continue
+        start = int(first)
+        stop = int(last) + 1 if last else size
+        if last and stop <= start:
+            return None
+        if start < size:
+            ranges.append((start, min(stop, size)))
+    return ranges
+
+
+class FileEntry():
+    """
+    What a response needs to know about one version of a file: its
+    validators, and its bytes if they're cached.
+    """
+    __slots__ = ("path", "mtime", "mtime_ns", "size", "etag", "body")
+
+    def __init__(self, path, stat, body=None):
+        self.path = path
+        self.mtime = stat.st_mtime
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size if body is None else len(body)
+        # Strong: a rewrite changes the mtime, and the ETag with it
+        self.etag = f'"{self.mtime_ns:x}-{self.size:x}"'
+        self.body = body
+
+
+class FileCache():
+    """
+    In-memory LRU cache of small files, bounded by the total bytes held.
+
+    Every lookup still stats the file, and an entry is only used while the
+    file's mtime and size match it, so edits show up on the next request.
+    Safe to share between worker threads.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, max_file_bytes=DEFAULT_CACHE_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path):
+        """
+        Returns the FileEntry for path's current contents, with body set
+        if the file is small enough to cache.
+
+        Raises:
+            OSError: if the file can't be read
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.discard(path)
+            raise
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        if stat.st_size > self.max_file_bytes:
+            return FileEntry(path, stat)
+
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            entry = FileEntry(path, stat, f.read())
+        self.put(entry)
+        return entry
+
+    def put(self, entry):
+        with self.lock:
+            old = self.entries.pop(entry.path, None)
+            if old is not None:
+                self.total_bytes -= old.size
+            self.entries[entry.path] = entry
+            self.total_bytes += entry.size
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                self.evictions += 1
+
+    def discard(self, path):
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old.size
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return (
+            f"FileCache({len(self.entries)} files, {self.total_bytes} bytes, "
+            f"hits: {self.hits}, misses: {self.misses}, evictions: {self.evictions})"
+        )
+
 
 class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
+    # Under a server with keep_alive set (PooledHTTPServer) the handler
+    # speaks HTTP/1.1, keeping connections open between requests. Every
+    # response then carries a Content-Length, and idle connections are
+    # dropped after timeout seconds so they can't hold a worker forever.
+    # Other servers get HTTP/1.0, where one idle client can't block them.
+    timeout = DEFAULT_KEEPALIVE_TIMEOUT
+    # Headers and body are separate writes; with Nagle's algorithm on, the
+    # body of a kept-alive response waits ~40ms for the client's delayed ACK.
+    disable_nagle_algorithm = True
+    file_cache = FileCache()
+    # Send uncached files with os.sendfile, straight from the page cache to
+    # the socket, instead of copying them through Python
+    use_sendfile = True
+
+    def setup(self):
+        if getattr(self.server, "keep_alive", False):
+            self.protocol_version = "HTTP/1.1"
+        super().setup()
+
     def end_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, OPTIONS")
@@ -12,21 +226,473 @@ class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
 
     def do_OPTIONS(self):
         self.send_response(200, "OK")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_head(self):
+        """
+        Serves regular files through file_cache, with ETag and
+        Last-Modified validators and 304 responses to conditional
+        requests. Directory redirects and listings are left to
+        SimpleHTTPRequestHandler.
+
+        A current gzip sidecar is sent instead of the file, with
+        Content-Encoding: gzip, when the client accepts gzip. Nothing is
+        compressed per request.
+
+        Range requests are answered as described in send_entry.
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                return super().send_head()
+            for index in "index.html", "index.htm":
+                index = os.path.join(path, index)
+                if os.path.isfile(index):
+                    path = index
+                    break
+            else:
+                return super().send_head()
+        if path.endswith("/"):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            entry = self.file_cache.get(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        content_type = self.guess_type(path)
+        gzip_entry = self.gzip_sidecar(path, entry, content_type)
+        encoding = None
+        if gzip_entry is not None and accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            # The sidecar is smaller than its source, so its ETag differs too
+            entry, encoding = gzip_entry, "gzip"
+        return self.send_entry(entry, content_type, encoding, vary=gzip_entry is not None)
+
+    def send_entry(self, entry, content_type, encoding=None, vary=False):
+        """
+        Sends the headers for entry, a FileEntry, and returns the file
+        object for copyfile to send its body from, or None when there's no
+        body to send.
+
+        A conditional request the client's copy satisfies gets a 304.
+        Range requests get a 206 with the one range asked for, or a
+        multipart/byteranges body for several. The bytes themselves are
+        written by copyfile, following body_parts.
+
+        Args:
+            entry: what to send; its body when cached, else the file at
+                entry.path
+            content_type: the Content-Type of the entry's contents
+            encoding: Content-Encoding of the entry, if any
+            vary: send Vary: Accept-Encoding, for files with a gzip sidecar
+        """
+        if self.not_modified(entry):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(entry)
+            if vary:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return None
+
+        path = entry.path
+        if entry.body is not None:
+            f = io.BytesIO(entry.body)
+        else:
+            try:
+                f = open(path, "rb")
+            except OSError:
+                self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+                return None
+            # Describe the file actually opened, in case it just changed
+            entry = FileEntry(path, os.fstat(f.fileno()))
+
+        ranges = self.requested_ranges(entry)
+        if ranges == []:
+            f.close()
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{entry.size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        # (bytes written before the range, start, length) per part
+        self.body_parts = [(b"", 0, entry.size)]
+        self.body_trailer = b""
+        length = entry.size
+        if ranges is None:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-type", content_type)
+        elif len(ranges) == 1:
+            start, stop = ranges[0]
+            self.body_parts = [(b"", start, stop - start)]
+            length = stop - start
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-type", content_type)
+            self.send_header("Content-Range", f"bytes {start}-{stop - 1}/{entry.size}")
+        else:
+            boundary = secrets.token_hex(16)
+            self.body_parts = []
+            for start, stop in ranges:
+                head = (
+                    f"\r\n--{boundary}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Range: bytes {start}-{stop - 1}/{entry.size}\r\n\r\n"
+                ).encode("latin-1")
+                self.body_parts.append((head, start, stop - start))
+            self.body_trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            length = sum(len(head) + part_length for head, _, part_length in self.body_parts)
+            length += len(self.body_trailer)
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-type", f"multipart/byteranges; boundary={boundary}")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        if vary:
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_validators(entry)
         self.end_headers()
+        return f
+
+    def requested_ranges(self, entry):
+        """
+        The byte ranges to send for entry, as parse_range returns them, or
+        None for the whole file. An If-Range that no longer matches (the
+        file changed since the client's partial copy) also means the
+        whole file.
+        """
+        range_header = self.headers.get("Range")
+        if range_header is None:
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range.strip() not in (entry.etag, self.date_time_string(entry.mtime)):
+            return None
+        return parse_range(range_header, entry.size)
+
+    def copyfile(self, source, outputfile):
+        """
+        Writes the parts send_head planned. Cached files are written from
+        memory; files on disk go through sendfile unless use_sendfile is
+        off.
+        """
+        for head, start, length in self.body_parts:
+            if head:
+                outputfile.write(head)
+            if length == 0:
+                continue
+            if isinstance(source, io.BytesIO):
+                # getvalue() hands back the cached bytes without a copy
+                outputfile.write(memoryview(source.getvalue())[start:start + length])
+            elif self.use_sendfile:
+                sent = self.connection.sendfile(source, start, length)
+                if sent < length:
+                    # The file shrank; the promised length can't be met
+                    self.close_connection = True
+                    return
+            else:
+                source.seek(start)
+                copied = 0
+                while copied < length:
+                    chunk = source.read(min(length - copied, 64 * 1024))
+                    if not chunk:
+                        self.close_connection = True
+                        return
+                    outputfile.write(chunk)
+                    copied += len(chunk)
+        if self.body_trailer:
+            outputfile.write(self.body_trailer)
+
+    def gzip_sidecar(self, path, entry, content_type):
+        """
+        Returns the FileEntry of path's gzip sidecar, or None if there's
+        no current one. A sidecar older or newer than its source (say, the
+        page was rebuilt without --gzip) is ignored.
+        """
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return None
+        try:
+            gzip_entry = self.file_cache.get(path + GZIP_SUFFIX)
+        except OSError:
+            return None
+        return gzip_entry if gzip_entry.mtime_ns == entry.mtime_ns else None
+
+    def send_validators(self, entry):
+        self.send_header("ETag", entry.etag)
+        self.send_header("Last-Modified", self.date_time_string(entry.mtime))
+
+    def not_modified(self, entry):
+        """
+        Whether the request's If-None-Match, or failing that its
+        If-Modified-Since, shows the client already has this version.
+        """
+        none_match = self.headers.get("If-None-Match")
+        if none_match is not None:
+            tags = [tag.strip() for tag in none_match.split(",")]
+            # If-None-Match compares weakly, so W/ prefixes are ignored
+            return "*" in tags or any(tag.removeprefix("W/") == entry.etag for tag in tags)
+
+        modified_since = self.headers.get("If-Modified-Since")
+        if modified_since is None:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(modified_since)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        # Last-Modified is sent with whole seconds
+        return int(entry.mtime) <= since.timestamp()
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that handles connections on a fixed pool of worker threads,
+    so one slow client or large download doesn't stall everyone else.
+
+    Accepted connections wait in the pool's queue while every worker is
+    busy. Past max_connections (working plus queued), new connections get
+    an immediate 503 instead of piling up.
+    """
+    keep_alive = True
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        workers=DEFAULT_WORKERS,
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+    ):
+        self.workers = workers
+        self.max_connections = max(max_connections, workers)
+        self.connection_slots = threading.BoundedSemaphore(self.max_connections)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self.rejected = 0
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        if not self.connection_slots.acquire(blocking=False):
+            self.rejected += 1
+            try:
+                request.sendall(BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        future = self.executor.submit(self.process_request_worker, request, client_address)
+        future.add_done_callback(lambda future: self.release_cancelled(future, request))
+
+    def release_cancelled(self, future, request):
+        # A connection still queued when the server closes never reaches a
+        # worker, so its socket and slot are given back here
+        if future.cancelled():
+            self.shutdown_request(request)
+            self.connection_slots.release()
+
+    def process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.connection_slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RenderedPages():
+    """
+    Memo of pages rendered from markdown for the dev server.
+
+    A page stays valid while its source and the template keep the mtime
+    and size it was rendered from, so a save re-renders just that page on
+    its next request. Safe to share between worker threads.
+
+    Pages are rendered with the site generator's modules, so creating one
+    puts SRC_DIR on sys.path; the plain file server never imports them.
+    """
+    def __init__(self, template_path, basepath="/"):
+        if SRC_DIR not in sys.path:
+            sys.path.insert(0, SRC_DIR)
+        self.template_path = template_path
+        self.basepath = basepath
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.renders = 0
+
+    def get(self, src_path):
+        """
+        Returns a FileEntry holding the rendered page, with an ETag from
+        its html and a Last-Modified from its source or the template,
+        whichever changed last.
+
+        Raises:
+            OSError: if the source or template can't be read
+        """
+        src_stat = os.stat(src_path)
+        template_stat = os.stat(self.template_path)
+        signature = (src_stat.st_mtime_ns, src_stat.st_size, template_stat.st_mtime_ns, template_stat.st_size)
+        with self.lock:
+            cached = self.entries.get(src_path)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                return cached[1]
+
+        from parse import markdown_to_html_node, extract_title
+        from template import load_template
+
+        with open(src_path) as f:
+            source_md = f.read()
+        template = load_template(self.template_path, self.basepath)
+        html = template.render(Title=extract_title(source_md), Content=markdown_to_html_node(source_md).to_html())
+        body = html.encode("utf-8")
+
+        entry = FileEntry(src_path, src_stat, body)
+        entry.mtime = max(src_stat.st_mtime, template_stat.st_mtime)
+        entry.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        with self.lock:
+            self.entries[src_path] = (signature, entry)
+            self.renders += 1
+        return entry
+
+    def __repr__(self):
+        return f"RenderedPages({len(self.entries)} pages, hits: {self.hits}, renders: {self.renders})"
+
+
+class DevHTTPRequestHandler(CORSHTTPRequestHandler):
+    """
+    Serves the site straight from its sources, without a build: page
+    requests render the matching markdown under content_dir through the
+    template, and everything else is served from the handler's
+    directory (the static files).
+
+    Request paths map onto content_dir the way the build lays pages out:
+    /blog/tom/ and /blog/tom/index.html come from blog/tom/index.md,
+    /about.html from about.md.
+    """
+    content_dir = "content"
+    rendered_pages = None # a RenderedPages, set by run_dev
+
+    def send_head(self):
+        split = urllib.parse.urlsplit(self.path)
+        url_path = urllib.parse.unquote(split.path)
+        basepath = self.rendered_pages.basepath.strip("/")
+        if basepath:
+            # Built pages link to /basepath/...; serve them from the root
+            prefix = f"/{basepath}"
+            if url_path == prefix or url_path.startswith(prefix + "/"):
+                url_path = url_path[len(prefix):] or "/"
+                self.path = urllib.parse.urlunsplit(("", "", urllib.parse.quote(url_path), split.query, ""))
+
+        # Dropping empty, "." and ".." parts keeps lookups inside content_dir
+        words = [word for word in url_path.split("/") if word and word not in (os.curdir, os.pardir)]
+        src_dir = os.path.join(self.content_dir, *words)
+        if os.path.isdir(src_dir):
+            if not url_path.endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", urllib.parse.quote(url_path) + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+            src_path = os.path.join(src_dir, "index.md")
+        elif url_path.endswith(".html"):
+            src_path = src_dir[:-len(".html")] + ".md"
+        else:
+            return super().send_head()
+        if not os.path.isfile(src_path):
+            return super().send_head()
+
+        try:
+            entry = self.rendered_pages.get(src_path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+        except Exception as e:
+            # Usually a markdown mistake mid-edit; show it instead of hanging up
+            self.log_error("Could not render %s: %r", src_path, e)
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "Could not render page", f"{src_path}: {e}")
+            return None
+        return self.send_entry(entry, "text/html")
+
+
+def make_server(
+    port,
+    handler_class=CORSHTTPRequestHandler,
+    workers=DEFAULT_WORKERS,
+    max_connections=DEFAULT_MAX_CONNECTIONS,
+    host="",
+):
+    """
+    Builds the server run() uses. With workers=0 this is the old
+    single-threaded HTTPServer, answering over HTTP/1.0 since one idle
+    keep-alive client would block it.
+    """
+    if workers <= 0:
+        return HTTPServer((host, port), handler_class)
+    return PooledHTTPServer((host, port), handler_class, workers, max_connections)
+
+
+def run_dev(
+    port=8000,
+    content_dir="content",
+    static_dir="static",
+    template_path="template.html",
+    basepath="/",
+    workers=DEFAULT_WORKERS,
+    max_connections=DEFAULT_MAX_CONNECTIONS,
+):
+    """
+    Serves the site from its sources with DevHTTPRequestHandler: pages are
+    rendered when requested, so an edit shows up on the next reload
+    without rebuilding docs/.
+    """
+    rendered_pages = RenderedPages(template_path, basepath)
+    handler_class = type(
+        "DevHandler",
+        (DevHTTPRequestHandler,),
+        {"content_dir": content_dir, "rendered_pages": rendered_pages},
+    )
+    handler = functools.partial(handler_class, directory=static_dir)
+    httpd = make_server(port, handler, workers, max_connections)
+    print(f"Rendering '{content_dir}' on demand at http://localhost:{port}, static files from '{static_dir}'...")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(repr(rendered_pages))
+    finally:
+        httpd.server_close()
 
 
 def run(
-    server_class=HTTPServer,
+    server_class=None,
     handler_class=CORSHTTPRequestHandler,
     port=8000,
     directory=None,
+    workers=DEFAULT_WORKERS,
+    max_connections=DEFAULT_MAX_CONNECTIONS,
 ):
     if directory:  # Change the current working directory if directory is specified
         os.chdir(directory)
-    server_address = ("", port)
-    httpd = server_class(server_address, handler_class)
-    print(f"Serving HTTP on http://localhost:{port} from directory '{directory}'...")
-    httpd.serve_forever()
+    if server_class is None:
+        httpd = make_server(port, handler_class, workers, max_connections)
+    else:
+        server_address = ("", port)
+        httpd = server_class(server_address, handler_class)
+    mode = f"{workers} workers" if workers > 0 and server_class is None else "single-threaded"
+    print(f"Serving HTTP on http://localhost:{port} from directory '{directory}' ({mode})...")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        cache = getattr(handler_class, "file_cache", None)
+        if cache is not None:
+            print(f"File cache: {cache.hit_rate():.1%} hit rate, {cache!r}")
+    finally:
+        httpd.server_close()
 
 
 if __name__ == "__main__":
@@ -35,6 +701,63 @@ if __name__ == "__main__":
         "--dir", type=str, help="Directory to serve files from", default="."
     )
     parser.add_argument("--port", type=int, help="Port to serve HTTP on", default=8888)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Worker threads handling connections; 0 serves one request at a time",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help="Connections being handled or queued before new ones get a 503",
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=float,
+        default=DEFAULT_KEEPALIVE_TIMEOUT,
+        help="Seconds an idle keep-alive connection is kept open",
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=float,
+        default=DEFAULT_CACHE_BYTES / 2**20,
+        help="Memory for caching small files; 0 reads every file from disk",
+    )
+    parser.add_argument(
+        "--no-sendfile",
+        action="store_true",
+        help="Copy files to the socket through Python instead of using os.sendfile",
+    )
+    parser.add_argument(
+        "--dev",
+        action="store_true",
+        help="Render pages from --content on request instead of serving a built --dir",
+    )
+    parser.add_argument("--content", type=str, help="Markdown sources for --dev", default="content")
+    parser.add_argument("--static", type=str, help="Static files for --dev", default="static")
+    parser.add_argument("--template", type=str, help="Page template for --dev", default="template.html")
+    parser.add_argument("--basepath", type=str, help="Base path the --dev pages link to, as for main.py", default="/")
     args = parser.parse_args()
 
-    run(port=args.port, directory=args.dir)
+    CORSHTTPRequestHandler.timeout = args.keepalive_timeout
+    CORSHTTPRequestHandler.file_cache = FileCache(int(args.cache_mb * 2**20))
+    CORSHTTPRequestHandler.use_sendfile = not args.no_sendfile
+    if args.dev:
+        run_dev(
+            port=args.port,
+            content_dir=args.content,
+            static_dir=args.static,
+            template_path=args.template,
+            basepath=args.basepath,
+            workers=args.workers,
+            max_connections=args.max_connections,
+        )
+        sys.exit()
+    run(
+        port=args.port,
+        directory=args.dir,
+        workers=args.workers,
+        max_connections=args.max_connections,
+    )
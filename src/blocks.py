@@ -9,35 +9,173 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
     PARAGRAPH = "paragraph"
 
+# The checks below are plain string operations plus anchored regexes that
+# cannot backtrack, so classifying a block is linear in its length even
+# for adversarial input (megabyte fences, huge whitespace runs).
+FENCE_INFO_REGEX = re.compile(r"[a-zA-Z0-9]*")
+ORDERED_ITEM_REGEX = re.compile(r"(\d+)\.\s")
+
+def is_heading(text):
+    """
+    Checks a stripped block against "#{1,6}, whitespace, one line of
+    content", the old ^(#{1,6})\\s+(.+)$ regex, without its quadratic
+    backtracking on long whitespace runs.
+    """
+    content = text.lstrip("#")
+    hashes = len(text) - len(content)
+    if not 1 <= hashes <= 6 or not content[:1].isspace():
+        return False
+    content = content.lstrip()
+    return content != "" and "\n" not in content
+
+def is_fence_open(line):
+    return line.startswith("```") and FENCE_INFO_REGEX.fullmatch(line, 3) is not None
+
+def is_unordered_item(line):
+    # line is stripped, so whitespace after the marker is always followed by content
+    return len(line) > 1 and line[0] in "-*+" and line[1].isspace()
+
+def ordered_item_number(line):
+    """
+    Returns the number of a stripped "N. text" line, or None.
+    """
+    match = ORDERED_ITEM_REGEX.match(line)
+    return int(match.group(1)) if match else None
+
+def _first_line_type(line):
+    """
+    Returns (block type, ordered list number) for the first line of a block.
+    """
+    if is_heading(line):
+        return BlockType.HEADING.value, None
+    if line.startswith(">"):
+        return BlockType.QUOTE.value, None
+    if is_unordered_item(line):
+        return BlockType.UNORDERED_LIST.value, None
+    number = ordered_item_number(line)
+    if number is not None:
+        return BlockType.ORDERED_LIST.value, number
+    return BlockType.PARAGRAPH.value, None
+
+def scan_blocks(lines):
+    """
+    Groups markdown lines into blocks and classifies them in one pass.
+
+    A block ends at an empty line. Lines are stripped and whitespace-only
+    lines dropped, as markdown_to_blocks does. Each block's type is picked
+    from its first line and falls back to paragraph as soon as a later line
+    doesn't fit, so no block is ever rescanned. A block that starts with a
+    ``` fence runs to the closing ``` line (or the end of the document),
+    keeping any blank lines inside it.
+
+    Args:
+        lines: An iterable of lines without their line endings.
+
+    Yields:
+        Tuples (block type, list of stripped lines). Code blocks include
+        the opening fence line but not the closing one.
+    """
+    block = []
+    block_type = None
+    number = None
+    fence = None
+
+    for line in lines:
+        if fence is not None:
+            line = line.strip()
+            if line == "```":
+                yield BlockType.CODE.value, fence
+                fence = None
+            else:
+                fence.append(line)
+            continue
+
+        if not line:
+            if block:
+                yield block_type, block
+                block = []
+            continue
+        line = line.strip()
+        if not line:
+            continue
+
+        if not block:
+            if is_fence_open(line):
+                fence = [line]
+            else:
+                block_type, number = _first_line_type(line)
+                block.append(line)
+            continue
+
+        block.append(line)
+        if block_type == BlockType.PARAGRAPH.value:
+            continue
+        if block_type == BlockType.QUOTE.value:
+            fits = line.startswith(">")
+        elif block_type == BlockType.UNORDERED_LIST.value:
+            fits = is_unordered_item(line)
+        elif block_type == BlockType.ORDERED_LIST.value:
+            fits = ordered_item_number(line) == number + 1
+            number += 1
+        else:
+            fits = False # headings are a single line
+        if not fits:
+            block_type = BlockType.PARAGRAPH.value
+
+    if fence is not None:
+        yield BlockType.CODE.value, fence
+    elif block:
+        yield block_type, block
+
 def block_to_block_type(markdown):
-    if is_valid_md_header(markdown):
+    block = markdown.strip()
+    if is_heading(block):
         return BlockType.HEADING.value
-    elif is_valid_md_code_block(markdown):
+    if _is_code_block(block):
         return BlockType.CODE.value
-    elif is_valid_md_quote_block(markdown):
+    if not block:
+        return BlockType.PARAGRAPH.value
+
+    lines = [line.strip() for line in block.split("\n")]
+    if _all_quote_lines(lines):
         return BlockType.QUOTE.value
-    elif is_valid_md_unordered_list(markdown):
+    if all(is_unordered_item(line) for line in lines):
         return BlockType.UNORDERED_LIST.value
-    elif is_valid_md_ordered_list(markdown):
+    if _is_numbered_sequence(lines):
         return BlockType.ORDERED_LIST.value
-    else:
-        return BlockType.PARAGRAPH.value
+    return BlockType.PARAGRAPH.value
+
+def _is_code_block(block):
+    # "```info\n", anything, then "\n```" at the very end
+    first_newline = block.find("\n")
+    return (
+        first_newline != -1
+        and is_fence_open(block[:first_newline])
+        and block.endswith("\n```")
+        and first_newline < len(block) - 4
+    )
+
+def _all_quote_lines(lines):
+    return all(line.startswith(">") for line in lines)
+
+def _is_numbered_sequence(lines):
+    expected_number = None
+    for line in lines:
+        number = ordered_item_number(line)
+        if number is None or (expected_number is not None and number != expected_number):
+            return False
+        expected_number = number + 1
+    return True
 
 def is_valid_md_header(line):
     """
     Checks if a single line string is a valid ATX Markdown header.
     e.g., '# Header 1', '## Header 2'
     """
-    # Regex: Start (^), 1-6 hashes (#{1,6}), space (\s+), content (.+), End ($)
-    header_regex = r"^(#{1,6})\s+(.+)$"
-    stripped_line = line.strip() # Strip first
-    header_match = re.fullmatch(header_regex, stripped_line)
-    return header_match is not None
+    return is_heading(line.strip())
 
 def is_valid_md_code_block(string):
-    code_block_regex =r"^```(?:[a-zA-Z0-9]*)?\n([\s\S]*?)\n^```$"
-    code_block_match = re.fullmatch(code_block_regex, string.strip(), re.MULTILINE)
-    return code_block_match is not None
+    return _is_code_block(string.strip())
 
 def is_valid_md_quote_block(text_block):
     """
@@ -45,21 +183,8 @@ def is_valid_md_quote_block(text_block):
     Each line must start with '> ' or just '>'.
     e.g., '> Line 1\n> Line 2'
     """
-    lines = text_block.strip().split('\n')
-
-    if not lines or not text_block.strip():
-        return False
-    
-    for line in lines:
-        stripped_line = line.strip()
-        if stripped_line and not re.match(r"^>\s?", stripped_line):
-             return False
-
-        if not stripped_line and line != ">": # Check original line if stripped is empty
-             if not line.strip(): # If the original line was just whitespace/empty
-                 return False # Invalid structure
-
-    return True
+    block = text_block.strip()
+    return block != "" and _all_quote_lines([line.strip() for line in block.split("\n")])
 
 def is_valid_md_unordered_list(text_block):
     """
@@ -67,16 +192,8 @@ def is_valid_md_unordered_list(text_block):
     Each line must start with '*', '-', or '+' followed by a space and content.
     e.g., '* Item 1\n* Item 2' or '- Item A\n- Item B'
     """
-    lines = text_block.strip().split('\n')
-    if not lines or not text_block.strip():
-        return False
-
-    for line in lines:
-
-        if not re.match(r"^[-*+]\s+.+", line.strip()):
-            return False
-
-    return True
+    block = text_block.strip()
+    return block != "" and all(is_unordered_item(line.strip()) for line in block.split("\n"))
 
 def is_valid_md_ordered_list(text_block):
     """
@@ -85,27 +202,5 @@ def is_valid_md_ordered_list(text_block):
     Each line must start with digits, a period, a space, and content.
     e.g., '1. Item 1\n2. Item 2' or '5. Item 5\n6. Item 6'
     """
-    lines = text_block.strip().split('\n')
-    if not lines or not text_block.strip():
-        return False
-
-    expected_number = None
-    ordered_list_pattern = r"^(\d+)\.\s+.+"
-
-    for i, line in enumerate(lines):
-        stripped_line = line.strip()
-        match = re.match(ordered_list_pattern, stripped_line)
-
-        if not match:
-            return False # Line doesn't match the pattern 'N. text'
-
-        current_number = int(match.group(1))
-
-        if i == 0:
-            expected_number = current_number
-        else:
-            if current_number != expected_number + 1:
-                return False # Numbers are not sequential
-            expected_number = current_number
-
-    return True
\ No newline at end of file
+    block = text_block.strip()
+    return block != "" and _is_numbered_sequence([line.strip() for line in block.split("\n")])
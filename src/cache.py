@@ -0,0 +1,123 @@
+import hashlib, json, os, tempfile
+
+from log import logger
+from parse import PARSER_VERSION
+from textnode import uses_default_renderers
+
+_open_caches = {}
+
+class ParseCache():
+    """
+    An on-disk cache of rendered page bodies, keyed by a hash of the
+    markdown source plus PARSER_VERSION. Only html built by the default
+    text renderers is cached; with custom ones registered every lookup
+    misses and nothing is stored.
+
+    Each entry is a small JSON file holding the page title and body html.
+    Hits touch the entry's mtime, and prune() evicts the least recently
+    used entries once the cache grows past max_bytes. Several processes
+    can share one cache directory; entries are written atomically.
+    """
+    def __init__(self, cache_dir, max_bytes=256 * 2**20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def key(self, source_md):
+        digest = hashlib.sha256(f"v{PARSER_VERSION}\0".encode())
+        digest.update(source_md.encode())
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get(self, source_md):
+        """
+        Returns (title, body html) for source_md, or None on a miss.
+        """
+        if not uses_default_renderers():
+            self.misses += 1
+            return None
+        path = self.path(self.key(source_md))
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path) # mark as recently used for LRU eviction
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["title"], entry["html"]
+
+    def put(self, source_md, title, html):
+        if not uses_default_renderers():
+            return
+        path = self.path(self.key(source_md))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with open(fd, "w") as f:
+                json.dump({"title": title, "html": html}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.writes += 1
+
+    def prune(self):
+        """
+        Deletes least recently used entries until the cache fits in
+        max_bytes.
+
+        Returns:
+            The number of entries evicted.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        entries = []
+        total = 0
+        for bucket in os.scandir(self.cache_dir):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        evicted = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+
+        self.evictions += evicted
+        return evicted
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __repr__(self):
+        return f"ParseCache({self.cache_dir}, hits: {self.hits}, misses: {self.misses})"
+
+def open_parse_cache(cache_dir, max_bytes=256 * 2**20):
+    """
+    Returns this process's ParseCache for cache_dir, so every page built
+    by the same process (or --jobs worker) shares one set of counters.
+    """
+    cache = _open_caches.get(cache_dir)
+    if cache is None:
+        cache = ParseCache(cache_dir, max_bytes)
+        _open_caches[cache_dir] = cache
+        logger.debug(f"Using parse cache in '{cache_dir}'")
+    return cache
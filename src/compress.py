@@ -0,0 +1,138 @@
+import gzip, os, tempfile, time
+
+from log import logger
+from parallel import run_parallel, print_worker_stats
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".txt", ".xml")
+SIDECAR_SUFFIX = ".gz"
+MIN_COMPRESS_BYTES = 256 # below this the gzip header eats most of the savings
+
+def new_compress_stats():
+    return {
+        "written": 0,
+        "unchanged": 0,
+        "skipped": 0,
+        "removed": 0,
+        "bytes": 0,
+        "compressed_bytes": 0,
+    }
+
+def is_compressible(path):
+    return path.lower().endswith(COMPRESSIBLE_EXTENSIONS)
+
+def sidecar_path(path):
+    return path + SIDECAR_SUFFIX
+
+def sidecar_is_fresh(src_stat, sidecar_stat):
+    """
+    Whether a sidecar still matches its source. compress_file stamps each
+    sidecar with its source's mtime, so any later write to the source
+    makes them differ.
+    """
+    return sidecar_stat.st_mtime_ns == src_stat.st_mtime_ns
+
+def compress_file(src_path):
+    """
+    Writes src_path's gzip sidecar at maximum compression, unless the
+    existing one is already up to date. Sources smaller than
+    MIN_COMPRESS_BYTES, or that gzip doesn't shrink, get no sidecar and
+    lose any old one.
+
+    Returns:
+        A tuple (status, source bytes, sidecar bytes) where status is
+        "written", "unchanged" or "skipped".
+    """
+    gz_path = sidecar_path(src_path)
+    src_stat = os.stat(src_path)
+    try:
+        gz_stat = os.stat(gz_path)
+    except FileNotFoundError:
+        gz_stat = None
+    if gz_stat is not None and sidecar_is_fresh(src_stat, gz_stat):
+        return "unchanged", src_stat.st_size, gz_stat.st_size
+
+    compressed = None
+    if src_stat.st_size >= MIN_COMPRESS_BYTES:
+        with open(src_path, "rb") as f:
+            data = f.read()
+        # mtime=0 keeps the output identical for identical input
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            compressed = None
+    if compressed is None:
+        if gz_stat is not None:
+            os.remove(gz_path)
+        return "skipped", src_stat.st_size, 0
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(src_path) or ".", prefix=f".{os.path.basename(gz_path)}.", suffix=".tmp"
+    )
+    try:
+        with open(fd, "wb") as f:
+            f.write(compressed)
+        os.chmod(tmp_path, src_stat.st_mode & 0o777)
+        os.utime(tmp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp_path, gz_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return "written", src_stat.st_size, len(compressed)
+
+def compress_tree(root, jobs=1, static_files=()):
+    """
+    Brings the gzip sidecars of every compressible file below root up to
+    date, spreading the compression over a process pool when jobs > 1.
+    Sidecars whose source no longer exists are removed.
+
+    Args:
+        root: The output directory.
+        jobs: Number of worker processes.
+        static_files: Paths relative to root that were copied from the
+            static files; .gz files among them are assets, not sidecars,
+            so they are neither removed nor overwritten.
+
+    Returns:
+        A stats dict as made by new_compress_stats
+    """
+    stats = new_compress_stats()
+    assets = {os.path.join(root, rel_path) for rel_path in static_files}
+    sources = []
+    sidecars = []
+    for dir_path, _, file_names in os.walk(root):
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            if name.endswith(SIDECAR_SUFFIX):
+                if is_compressible(path[:-len(SIDECAR_SUFFIX)]) and path not in assets:
+                    sidecars.append(path)
+            elif is_compressible(path) and sidecar_path(path) not in assets:
+                sources.append(path)
+
+    existing = set(sources)
+    for gz_path in sidecars:
+        if gz_path[:-len(SIDECAR_SUFFIX)] not in existing:
+            logger.debug(f"  Removing orphaned sidecar: {gz_path}")
+            os.remove(gz_path)
+            stats["removed"] += 1
+
+    if jobs <= 1 or len(sources) <= 1:
+        results = [compress_file(path) for path in sources]
+    else:
+        start = time.perf_counter()
+        results, worker_stats = run_parallel(compress_file, [(path,) for path in sources], jobs)
+        print_worker_stats(worker_stats, time.perf_counter() - start, unit="files")
+
+    for status, size, compressed_size in results:
+        stats[status] += 1
+        if status != "skipped":
+            stats["bytes"] += size
+            stats["compressed_bytes"] += compressed_size
+    return stats
+
+def format_compress_stats(stats):
+    ratio = stats["compressed_bytes"] / stats["bytes"] if stats["bytes"] else 1.0
+    return (
+        f"{stats['written']} written, {stats['unchanged']} unchanged, "
+        f"{stats['skipped']} skipped, {stats['removed']} removed "
+        f"({stats['bytes']} -> {stats['compressed_bytes']} bytes, {ratio:.0%})"
+    )
@@ -0,0 +1,29 @@
+import unittest, os, tempfile
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A TestCase working in a fresh temporary directory, self.tmp, which is
+    removed after each test.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def path(self, *parts):
+        return os.path.join(self.tmp.name, *parts)
+
+    def write(self, path, data, mtime_ns=None):
+        """
+        Writes text or bytes to path, relative to the temporary directory
+        unless absolute, creating its parent directories.
+
+        Returns:
+            The absolute path
+        """
+        path = self.path(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
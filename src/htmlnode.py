@@ -1,30 +1,153 @@
+from html import escape
+from types import MappingProxyType
+
+# Most pages repeat the same few href/src values, so each distinct props
+# mapping is serialized once and its string shared by every node using it.
+# The table is emptied when it grows past the limit.
+ATTRIBUTE_STRINGS = {}
+ATTRIBUTE_STRINGS_LIMIT = 65536
+
+def escape_attribute(value):
+    return escape(str(value), quote=False).replace('"', "&quot;")
+
+def serialize_props(props):
+    """
+    Returns props as an html attribute string (' k="v"' pairs) with the
+    values escaped. Equal mappings get the same string object back.
+    """
+    if not props:
+        return ""
+    # The value's type is part of the key: 1, 1.0 and True are equal but
+    # print differently
+    if len(props) == 1:
+        # The common case, a lone href or src, without a generator
+        (k, v), = props.items()
+        key = (k, v.__class__, v)
+    else:
+        key = tuple((k, v.__class__, v) for k, v in props.items())
+    try:
+        attributes = ATTRIBUTE_STRINGS.get(key)
+    except TypeError:
+        # Unhashable values can't be interned; serialize them every time
+        key = attributes = None
+    if attributes is None:
+        attributes = "".join(f' {k}="{escape_attribute(v)}"' for k, v in props.items())
+        if key is not None:
+            if len(ATTRIBUTE_STRINGS) >= ATTRIBUTE_STRINGS_LIMIT:
+                ATTRIBUTE_STRINGS.clear()
+            ATTRIBUTE_STRINGS[key] = attributes
+    return attributes
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "_props", "attributes")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
-        self.props = props
+        self._props = props
+        self.attributes = None
+
+    @property
+    def props(self):
+        """
+        A read-only view of the props mapping the node was given. The node
+        keeps that mapping rather than a copy and serializes it once, on
+        first render, so it must not be modified afterwards; assign a new
+        mapping instead.
+        """
+        props = self._props
+        if props is not None and props.__class__ is not MappingProxyType:
+            # Wrapped on first access only, keeping construction cheap
+            props = self._props = MappingProxyType(props)
+        return props
+
+    @props.setter
+    def props(self, props):
+        self._props = props
+        self.attributes = None
+
+    def _props_repr(self):
+        # _props may have been wrapped in a view by the props getter
+        return dict(self._props) if self._props is not None else None
 
     def to_html(self):
         raise NotImplementedError()
+
+    def html_parts(self):
+        """
+        Returns the node as (opening html, children, closing html) for
+        render_chunks. A node without children can return all of its html
+        as the opening part, which is what this default does.
+        """
+        return self.to_html(), (), ""
+
+    def iter_html(self):
+        """
+        Yields the node's html in chunks, so large documents can be written
+        out without building the whole page as one string first.
+        """
+        opening, children, closing = self.html_parts()
+        yield opening
+        for child in children:
+            yield "".join(render_chunks(child))
+        if closing:
+            yield closing
+
+    def write_html(self, fp):
+        for chunk in self.iter_html():
+            fp.write(chunk)
     
     def props_to_html(self):
-        props_str = ""
-        
-        if self.props == None: return props_str
-        
-        for k, v in self.props.items():
-            props_str += f' {k}="{v}"'
-
-        return props_str
+        attributes = self.attributes
+        if attributes is None:
+            attributes = self.attributes = serialize_props(self._props)
+        return attributes
     
     def __eq__(self, other):
         return (
             self.tag == other.tag
             and self.value == other.value
             and self.children == other.children
-            and self.props == other.props
+            and self._props == other._props
         )
     
     def __repr__(self):
-        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
\ No newline at end of file
+        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self._props_repr()})"
+
+def render_chunks(node, out=None):
+    """
+    Renders node and everything under it into a list of html chunks.
+
+    The tree is walked with an explicit stack of nodes and pending closing
+    tags instead of recursion, and every chunk is appended to the one list,
+    so each piece of text is copied once however deep it sits and deep
+    trees can't hit the recursion limit. Works for any node that has
+    html_parts().
+
+    Args:
+        node: the root node
+        out: list to append to; a new one by default
+
+    Returns:
+        The list of chunks, to be joined once by the caller
+    """
+    if out is None:
+        out = []
+    append = out.append
+    stack = [node]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        item = pop()
+        if item.__class__ is str:
+            append(item)
+            continue
+        opening, children, closing = item.html_parts()
+        append(opening)
+        if children:
+            push(closing)
+            stack += children[::-1]
+        elif closing:
+            push(closing)
+    return out
@@ -0,0 +1,176 @@
+import re
+
+from textnode import TextNode, TEXT, BOLD, ITALIC, CODE, LINK, IMAGE
+
+# Every token starts with one of these characters. The lookahead lets the
+# regex engine skip plain text quickly instead of trying each alternative
+# at every position.
+TOKEN_REGEX = re.compile(r"(?=[*_`!\[\]])(?:\*\*|_|`|!\[|\[|\])")
+IMAGE_REGEX = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_DESTINATION_REGEX = re.compile(r"\]\(([^\(\)]*)\)")
+
+# Delimiter -> text type code of the span it encloses
+CONTAINERS = {
+    "**": BOLD,
+    "_": ITALIC,
+    "[": LINK,
+}
+
+class _Opener():
+    """
+    An opening "**", "_" or "[" that may still be closed. It sits in the
+    output list where it was seen and turns into literal text if it never
+    gets closed.
+    """
+    __slots__ = ("delimiter", "index", "active")
+
+    def __init__(self, delimiter, index):
+        self.delimiter = delimiter
+        self.index = index
+        self.active = True
+
+def _normalize(items):
+    """
+    Turns raw output items (strings, openers, finished nodes) into
+    TextNodes, merging neighbouring literal text.
+    """
+    nodes = []
+    text = []
+    for item in items:
+        if isinstance(item, str):
+            text.append(item)
+        elif isinstance(item, _Opener):
+            text.append(item.delimiter)
+        else:
+            if text:
+                nodes.append(TextNode("".join(text), TEXT))
+                text = []
+            nodes.append(item)
+    if text:
+        nodes.append(TextNode("".join(text), TEXT))
+    return nodes
+
+def _container(delimiter, items, url=None):
+    text_type = CONTAINERS[delimiter]
+    children = _normalize(items)
+    if not children:
+        # Empty emphasis ("****", "__") produces nothing, as it always
+        # has; an empty link text still makes a link.
+        return TextNode("", text_type, url) if url is not None else None
+    if len(children) == 1 and children[0].text_type == TEXT and children[0].children is None:
+        return TextNode(children[0].text, text_type, url)
+    # A nested span: its renderer gets the content as children
+    return TextNode("", text_type, url, children)
+
+class _InlineParser():
+    """
+    Parses one line of inline markdown with a delimiter stack.
+
+    Openers are pushed as they're seen. A closer pairs with the newest
+    open delimiter of its kind, found in O(1) through per-kind stacks.
+    Openers stacked above it were never closed and become literal text.
+    Each opener is pushed and popped once, and each output item is
+    wrapped into a span at most once, so parsing is linear in the line
+    length however the delimiters nest.
+    """
+    def __init__(self, text):
+        self.text = text
+        self.out = []
+        self.stack = []
+        self.open = {"**": [], "_": [], "[": []}
+
+    def push(self, delimiter):
+        opener = _Opener(delimiter, len(self.out))
+        self.out.append(opener)
+        self.stack.append(opener)
+        self.open[delimiter].append(opener)
+
+    def close(self, delimiter, url=None):
+        opener = self.open[delimiter].pop()
+        while True:
+            top = self.stack.pop()
+            if top is opener:
+                break
+            if top.active:
+                # Left open inside the span being closed: literal text
+                top.active = False
+                self.open[top.delimiter].pop()
+        opener.active = False
+
+        if delimiter == "[":
+            # Links don't nest, so an outer "[" can no longer open one
+            for outer in self.open["["]:
+                outer.active = False
+            self.open["["].clear()
+
+        node = _container(delimiter, self.out[opener.index + 1:], url)
+        del self.out[opener.index:]
+        if node is not None:
+            self.out.append(node)
+
+    def run(self):
+        text = self.text
+        out = self.out
+        position = 0
+        while True:
+            match = TOKEN_REGEX.search(text, position)
+            if match is None:
+                break
+            start = match.start()
+            if start > position:
+                out.append(text[position:start])
+            token = match.group()
+            position = match.end()
+
+            if token == "`":
+                # Code spans bind tightest: their content is never parsed
+                end = text.find("`", position)
+                if end == -1:
+                    out.append(token)
+                else:
+                    if end > position:
+                        out.append(TextNode(text[position:end], CODE))
+                    position = end + 1
+            elif token == "**" or token == "_":
+                if self.open[token]:
+                    self.close(token)
+                else:
+                    self.push(token)
+            elif token == "![":
+                image = IMAGE_REGEX.match(text, start)
+                if image is None:
+                    # As with the old link regex, "[" right after "!" never opens a link
+                    out.append(token)
+                else:
+                    out.append(TextNode(image.group(1), IMAGE, image.group(2)))
+                    position = image.end()
+            elif token == "[":
+                self.push(token)
+            else: # "]"
+                destination = LINK_DESTINATION_REGEX.match(text, start) if self.open["["] else None
+                if destination is None:
+                    out.append(token)
+                else:
+                    self.close("[", destination.group(1))
+                    position = destination.end()
+
+        if position < len(text):
+            out.append(text[position:])
+        return _normalize(out)
+
+def tokenize_inline(text):
+    """
+    Splits a line of inline markdown into nodes.
+
+    Flat spans come back as TextNodes, as the old split_nodes_* passes
+    produced them. A span with markup inside it (bold inside a link, code
+    inside italic, ...) comes back as a TextNode of its type whose
+    children are its own inline nodes, so it renders through
+    TEXT_RENDERERS like a flat span. Delimiters that are never closed stay
+    literal text.
+    """
+    if not text:
+        return []
+    if "*" not in text and "_" not in text and "`" not in text and "[" not in text:
+        return [TextNode(text, TEXT)]
+    return _InlineParser(text).run()
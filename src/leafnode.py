@@ -1,6 +1,8 @@
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value")
@@ -11,5 +13,8 @@ class LeafNode(HTMLNode):
             return self.value
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def html_parts(self):
+        return self.to_html(), (), ""
+
     def __repr__(self):
-        return f"LeafNode({self.tag}, {self.value}, {self.props})"
\ No newline at end of file
+        return f"LeafNode({self.tag}, {self.value}, {self._props_repr()})"
\ No newline at end of file
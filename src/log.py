@@ -0,0 +1,39 @@
+import logging, sys
+
+logger = logging.getLogger("ssg")
+
+class StdoutHandler(logging.StreamHandler):
+    """
+    A handler that writes to whatever sys.stdout is at the time of the
+    call, so contextlib.redirect_stdout (used to collect --jobs worker
+    logs) captures log records too.
+    """
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+def configure_logging(verbosity=0):
+    """
+    Sets up the build log. The default only shows warnings and errors,
+    -v adds build summaries and -vv adds a line per page and file.
+    """
+    if verbosity >= 2:
+        level = logging.DEBUG
+    elif verbosity == 1:
+        level = logging.INFO
+    else:
+        level = logging.WARNING
+
+    if not any(isinstance(handler, StdoutHandler) for handler in logger.handlers):
+        handler = StdoutHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
@@ -1,121 +1,384 @@
-import os, shutil, sys
+import argparse, os, time
 
-from parse import markdown_to_html_node, extract_title
+from cache import ParseCache, open_parse_cache
+from compress import compress_tree, format_compress_stats, is_compressible, sidecar_path
+from log import logger, configure_logging
+from manifest import hash_file, load_manifest, save_manifest, plan_build, output_signature
+from pages import discover_pages, write_page
+from parallel import resolve_jobs, run_parallel, print_worker_stats
+from parse import PARSER_VERSION, markdown_to_html_node, extract_title, extract_title_from_lines, iter_markdown_html
+from profiling import PageProfile, BuildProfile
+from sync import sync_tree, format_sync_stats, list_files, prune_tree, remove_empty_dirs
+from template import load_template
+from watch import SiteWatcher
 
 def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-
-    copy_static_resources()
-    generate_pages_recursive(basepath, "content", "template.html", "docs")
-
-def generate_pages_recursive(basepath, dir_path_content, template_path, dest_dir_path):
-    if not os.path.exists(dir_path_content):
-        raise ValueError(f"Source directory '{dir_path_content}' does not exist.")
-    if not os.path.isdir(dir_path_content):
-         raise ValueError(f"Source '{dir_path_content}' is not a directory.")
-    
-    for item in os.listdir(dir_path_content):
-        src_path = os.path.join(dir_path_content, item)
-        dest_path = os.path.join(dest_dir_path, item.replace(".md",".html"))
-
-        if os.path.isdir(src_path):
-            os.makedirs(dest_path, exist_ok=True)
-            generate_pages_recursive(basepath, src_path, template_path, dest_path)
-        elif os.path.isfile(src_path):
-            generate_page(basepath, src_path, template_path, dest_path)
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument(
+        "basepath", nargs="?", default="/", help="Base path the site is served from"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rebuild pages whose source or template changed since the last build",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=".build-manifest.json",
+        help="Where to keep the incremental build manifest",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes used to render pages (0 = one per CPU core)",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="With --incremental, compare static files by hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--hardlink",
+        action="store_true",
+        help="With --incremental, hardlink static files into docs/ instead of copying them",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild only what changed whenever a source is saved",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Log build summaries (-v) or every page and file (-vv)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="build-profile.json",
+        default=None,
+        metavar="JSON_PATH",
+        help="Time each build phase per page, print the slowest pages and save the timings as JSON",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        nargs="?",
+        const=".ssg-cache",
+        default=None,
+        metavar="DIR",
+        help="Reuse rendered page bodies from an on-disk cache keyed by markdown hash",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="Size cap for --parse-cache; least recently used entries are evicted beyond it",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=32,
+        metavar="MB",
+        help="Stream markdown files larger than this block by block instead of loading them whole (0 = stream every page)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write .gz sidecars of html/css/js outputs for server.py to send precompressed; only changed files are recompressed",
+    )
+    args = parser.parse_args()
+    # Watch mode is interactive, so always report what it rebuilds
+    configure_logging(max(args.verbose, 1) if args.watch else args.verbose)
+    jobs = resolve_jobs(args.jobs)
+    build_profile = BuildProfile() if args.profile else None
+    parse_cache = ParseCache(args.parse_cache, args.cache_size * 2**20) if args.parse_cache else None
+    stream_threshold = args.stream_threshold * 2**20
+
+    if args.watch:
+        if args.incremental:
+            sync_static_resources(
+                "static", "docs", args.manifest, checksum=args.checksum, hardlink=args.hardlink
+            )
         else:
-            print(f"  Skipping item (not file or directory): {src_path}")
+            sync_output("static", "docs", discover_pages("content", "docs"))
+        watcher = SiteWatcher(args.basepath, "content", "static", "template.html", "docs")
+        watcher.start()
+        watcher.run()
+    elif args.incremental:
+        sync_static_resources(
+            "static", "docs", args.manifest, checksum=args.checksum, hardlink=args.hardlink
+        )
+        generate_pages_incremental(
+            args.basepath, "content", "template.html", "docs", args.manifest, jobs, build_profile, parse_cache,
+            stream_threshold,
+        )
+    else:
+        start = time.perf_counter()
+        pages = discover_pages("content", "docs")
+        if build_profile is not None:
+            build_profile.add("discovery", time.perf_counter() - start)
+        sync_output("static", "docs", pages)
+        generate_pages(args.basepath, pages, "template.html", jobs, build_profile, parse_cache, stream_threshold)
+
+    if args.gzip:
+        stats = compress_tree("docs", jobs, list_files("static"))
+        logger.info(f"Gzip sidecars: {format_compress_stats(stats)}.")
+
+    if parse_cache is not None:
+        evicted = parse_cache.prune()
+        logger.info(
+            f"Parse cache: {parse_cache.hits} hits, {parse_cache.misses} misses "
+            f"({parse_cache.hit_rate():.0%} hit rate), {evicted} evicted."
+        )
+
+    if build_profile is not None:
+        print(build_profile.report())
+        build_profile.save(args.profile)
+        print(f"Profile written to {args.profile}")
+
+def sync_output(static_dir, dest_dir, pages):
+    """
+    Prepares dest_dir for a full build without clearing it, so static
+    files and pages that didn't change keep their mtimes for rsync/CDN
+    deploys. Static files are synced, and any file that is neither a
+    static file, one of the pages' outputs nor a gzip sidecar of those is
+    removed.
+    """
+    logger.info(f"Syncing static files from '{static_dir}' to '{dest_dir}'...")
+    os.makedirs(dest_dir, exist_ok=True)
+    synced, stats = sync_tree(static_dir, dest_dir)
+    keep = set(synced)
+    keep.update(os.path.relpath(dest_path, dest_dir) for _, dest_path in pages)
+    keep.update([sidecar_path(rel_path) for rel_path in keep if is_compressible(rel_path)])
+    stats["removed"] += prune_tree(dest_dir, keep)
+    logger.info(f"Static sync: {format_sync_stats(stats)}.")
+    return stats
+
+def generate_pages(basepath, pages, template_path, jobs=1, build_profile=None, parse_cache=None, stream_threshold=None):
+    """
+    Generates every (source path, output path) pair in pages, spreading
+    the work over a process pool when jobs > 1. The written files are the
+    same as with a serial build. Per-page timings are collected into
+    build_profile, and cache hits and misses into parse_cache, when given.
+    Sources larger than stream_threshold bytes are streamed (see
+    generate_page).
+
+    Returns:
+        The number of output files actually written; pages whose html
+        did not change are left untouched.
+    """
+    cache_dir = parse_cache.cache_dir if parse_cache is not None else None
+    arg_list = [
+        (basepath, src_path, template_path, dest_path, build_profile is not None, cache_dir, stream_threshold)
+        for src_path, dest_path in pages
+    ]
+    if jobs <= 1 or len(pages) <= 1:
+        results = [generate_page_job(*args) for args in arg_list]
+    else:
+        start = time.perf_counter()
+        results, worker_stats = run_parallel(generate_page_job, arg_list, jobs)
+        print_worker_stats(worker_stats, time.perf_counter() - start)
+
+    written = 0
+    for page_written, page_profile, cache_hit in results:
+        written += 1 if page_written else 0
+        if build_profile is not None:
+            build_profile.add_page(page_profile)
+        if parse_cache is not None:
+            if cache_hit:
+                parse_cache.hits += 1
+            else:
+                parse_cache.misses += 1
+
+    logger.info(f"Wrote {written} pages, {len(results) - written} unchanged.")
+    return written
+
+def generate_pages_incremental(basepath, dir_path_content, template_path, dest_dir_path, manifest_path, jobs=1, build_profile=None, parse_cache=None, stream_threshold=None):
+    """
+    Regenerates only the pages whose source changed since the build recorded
+    in the manifest. A template, basepath or PARSER_VERSION change rebuilds
+    every page, as does an output changed since it was recorded (e.g. by a
+    plain build), and outputs whose sources were removed are deleted.
+    """
+    manifest = load_manifest(manifest_path)
+    template_hash = hash_file(template_path)
+
+    start = time.perf_counter()
+    pages = {}
+    for src_path, dest_path in discover_pages(dir_path_content, dest_dir_path):
+        pages[src_path] = (hash_file(src_path), dest_path)
+    if build_profile is not None:
+        build_profile.add("discovery", time.perf_counter() - start)
+
+    to_build, unchanged, stale_outputs = plan_build(manifest, pages, template_hash, basepath, PARSER_VERSION)
+
+    for dest_path in stale_outputs:
+        if os.path.isfile(dest_path):
+            logger.debug(f"Removing stale output: {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
 
-def generate_page(basepath, from_path, template_path, dest_path):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}...")
-    
-    print("Extracting source markdown content...")
+    generate_pages(
+        basepath,
+        [(src_path, pages[src_path][1]) for src_path in to_build],
+        template_path,
+        jobs,
+        build_profile,
+        parse_cache,
+        stream_threshold,
+    )
+
+    manifest.update({
+        "basepath": basepath,
+        "template": template_hash,
+        "parser_version": PARSER_VERSION,
+        "pages": {
+            src_path: {"hash": src_hash, "output": dest_path, "output_signature": output_signature(dest_path)}
+            for src_path, (src_hash, dest_path) in pages.items()
+        },
+    })
+    save_manifest(manifest, manifest_path)
+
+    logger.info(f"Incremental build: {len(to_build)} rebuilt, {len(unchanged)} unchanged, {len(stale_outputs)} removed.")
+    return to_build
+
+def generate_page(basepath, from_path, template_path, dest_path, profile=None, cache=None, stream_threshold=None):
+    """
+    Renders one markdown file into dest_path through the template.
+
+    When profile (a PageProfile) is given, each phase is timed into it.
+    When cache (a ParseCache) is given, the title and body html are
+    looked up by the markdown's hash first, and parsing is skipped on a
+    hit. In both cases the body is rendered to a string before templating;
+    otherwise it is streamed straight into the output file.
+
+    Sources larger than stream_threshold bytes skip the cache and go
+    through generate_page_streaming instead.
+
+    Returns:
+        True if dest_path was written, False if it was already up to date.
+    """
+    if stream_threshold is not None and os.path.getsize(from_path) > stream_threshold:
+        return generate_page_streaming(basepath, from_path, template_path, dest_path, profile)
+
+    logger.debug(f"Generating page from {from_path} to {dest_path} using {template_path}...")
+    clock = time.perf_counter
+
+    logger.debug("Extracting source markdown content...")
+    start = clock()
     with open(from_path) as f:
         source_md = f.read()
-    
-    print("Extracting html template...")
-    with open(template_path) as f:
-        template_html = f.read()
+    read_done = clock()
 
-    print("Converting source markdown to html...")
-    html_content = markdown_to_html_node(source_md).to_html()
+    logger.debug("Loading html template...")
+    template = load_template(template_path, basepath)
 
-    print("Extracting page title from source markdown...")
-    html_title = extract_title(source_md)
+    cached = cache.get(source_md) if cache is not None else None
+    to_html_seconds = 0.0
+    if cached is not None:
+        logger.debug("Using cached html for source markdown...")
+        html_title, html_content = cached
+    else:
+        logger.debug("Converting source markdown to html...")
+        html_node = markdown_to_html_node(source_md, profile)
 
-    print("Populating template with content...")
-    html = template_html.replace("{{ Title }}", html_title)
-    html = html.replace("{{ Content }}", html_content)
-    if basepath != "/":
-        html = html.replace('href="/', f'href="/{basepath}/')
-        html = html.replace('src="/', f'src="/{basepath}/')
+        logger.debug("Extracting page title from source markdown...")
+        html_title = extract_title(source_md)
 
-    target_dir = os.path.dirname(dest_path)
-    if not os.path.exists(target_dir):
-        os.makedirs(target_dir)
+        if profile is None and cache is None:
+            logger.debug("Populating template with content...")
+            # The body html is streamed chunk by chunk straight into the output file
+            chunks = template.iter_render(Title=html_title, Content=html_node.iter_html())
+            return write_page(chunks, dest_path)
 
-    with open(dest_path, 'w') as f:
-        f.write(html)
-        f.close()
+        to_html_start = clock()
+        html_content = html_node.to_html()
+        to_html_seconds = clock() - to_html_start
+        if cache is not None:
+            cache.put(source_md, html_title, html_content)
 
-def copy_static_resources(src="static", dest="docs"):
+    logger.debug("Populating template with content...")
+    template_start = clock()
+    html = template.render(Title=html_title, Content=html_content)
+    write_start = clock()
+    written = write_page(html, dest_path)
+    write_done = clock()
+
+    if profile is not None:
+        profile.add("read", read_done - start)
+        profile.add("to_html", to_html_seconds)
+        profile.add("template", write_start - template_start)
+        profile.add("write", write_done - write_start)
+    return written
+
+def generate_page_streaming(basepath, from_path, template_path, dest_path, profile=None):
     """
-    Clears the destination directory and recursively copies files
-    from the source directory to the destination directory.
+    generate_page for very large sources. The markdown is read line by
+    line and each block's html is written to the output before the next
+    block is read, so memory use is bounded by the largest block rather
+    than the whole document. The title is found in a first pass over the
+    file. The output is the same as generate_page's.
+
+    Returns:
+        True if dest_path was written, False if it was already up to date.
     """
-    print(f"Preparing to copy from '{src}' to '{dest}'...")
-    # Ensure source directory exists
-    if not os.path.exists(src):
-        raise ValueError(f"Source directory '{src}' does not exist.")
-    if not os.path.isdir(src):
-         raise ValueError(f"Source '{src}' is not a directory.")
-
-    # Remove existing destination directory/file
-    if os.path.exists(dest):
-        print(f"Removing existing destination: '{dest}'")
-        # Check if it's a directory before using rmtree
-        if os.path.isdir(dest):
-             shutil.rmtree(dest)
-        else:
-             os.remove(dest)
+    logger.debug(f"Streaming page from {from_path} to {dest_path} using {template_path}...")
+    clock = time.perf_counter
+    template = load_template(template_path, basepath)
+    parse_seconds = profile.total if profile is not None else 0.0
 
-    # Create the top-level destination directory
-    print(f"Creating destination directory: '{dest}'")
-    # Use makedirs for safety, though mkdir would likely work here
-    os.makedirs(dest, exist_ok=True)
+    with open(from_path) as f:
+        start = clock()
+        html_title = extract_title_from_lines(f)
+        f.seek(0)
+        stream_start = clock()
+        lines = (line.rstrip("\n") for line in f)
+        chunks = template.iter_render(Title=html_title, Content=iter_markdown_html(lines, profile))
+        written = write_page(chunks, dest_path)
+        done = clock()
 
-    # Start the recursive copy process
-    recursive_copy(src, dest)
-    print("Copy complete.")
+    if profile is not None:
+        parse_seconds = profile.total - parse_seconds
+        profile.add("read", stream_start - start)
+        # Reading, templating and writing are interleaved with parsing here
+        profile.add("write", done - stream_start - parse_seconds)
+    return written
 
+def generate_page_job(basepath, from_path, template_path, dest_path, profile=False, cache_dir=None, stream_threshold=None):
+    """
+    generate_page as run by generate_pages, serially or in a --jobs
+    worker. Returns (written, PageProfile or None, cache hit) so the
+    parent can collect timings and cache counters.
+    """
+    page_profile = PageProfile(from_path) if profile else None
+    cache = open_parse_cache(cache_dir) if cache_dir else None
+    hits = cache.hits if cache is not None else 0
 
-def recursive_copy(src_dir, dest_dir):
+    written = generate_page(basepath, from_path, template_path, dest_path, page_profile, cache, stream_threshold)
+    cache_hit = cache.hits > hits if cache is not None else None
+    return written, page_profile, cache_hit
+
+def sync_static_resources(src, dest, manifest_path, checksum=False, hardlink=False):
     """
-    Recursively copies contents from src_dir to dest_dir.
-    Assumes src_dir exists and dest_dir exists.
+    Brings the static files in dest up to date without clearing it,
+    copying only what changed and removing files deleted from src.
+    The synced file list is kept in the build manifest.
     """
-    print(f"Processing source: {src_dir} -> Dest: {dest_dir}") # Debug print
-    for item in os.listdir(src_dir):
-        # Construct full source and destination paths using os.path.join
-        src_path = os.path.join(src_dir, item)
-        dest_path = os.path.join(dest_dir, item)
-
-        # Check if the current item is a directory
-        if os.path.isdir(src_path):
-            # Create the corresponding directory in the destination
-            # Use exist_ok=True in case it somehow already exists (though unlikely with rmtree)
-            print(f"  Creating directory: {dest_path}") # Debug print
-            os.makedirs(dest_path, exist_ok=True)
-            # Recursively call copy for the subdirectory
-            recursive_copy(src_path, dest_path)
-        # Check if the current item is a file
-        elif os.path.isfile(src_path):
-            # Copy the file
-            print(f"  Copying file: {src_path} -> {dest_path}") # Debug print
-            shutil.copy2(src_path, dest_path) # copy2 preserves more metadata than copy
-        else:
-            # Optionally handle other types like symbolic links, or just ignore them
-            print(f"  Skipping item (not file or directory): {src_path}")
+    logger.info(f"Syncing static files from '{src}' to '{dest}'...")
+    manifest = load_manifest(manifest_path)
+    synced, stats = sync_tree(
+        src, dest, manifest.get("static", []), checksum=checksum, hardlink=hardlink
+    )
+    manifest["static"] = synced
+    save_manifest(manifest, manifest_path)
+    logger.info(f"Static sync: {format_sync_stats(stats)}.")
+    return stats
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import hashlib, json, os
+
+MANIFEST_VERSION = 1
+
+def hash_file(path, chunk_size=1 << 16):
+    """
+    Returns the hex sha256 digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def output_signature(path):
+    """
+    Returns [mtime_ns, size] of a built output, or None if it is missing.
+    A page written by anything but the incremental build that recorded it
+    (a plain build, --watch, a manual edit) no longer matches.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def empty_manifest():
+    return {
+        "version": MANIFEST_VERSION,
+        "basepath": None,
+        "template": None,
+        "parser_version": None,
+        "pages": {},
+        "static": [],
+    }
+
+def load_manifest(path):
+    """
+    Loads a build manifest from disk.
+
+    A missing, unreadable or outdated manifest is treated as empty, which
+    simply forces a full rebuild.
+    """
+    if not os.path.isfile(path):
+        return empty_manifest()
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty_manifest()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+    return manifest
+
+def save_manifest(manifest, path):
+    """
+    Writes the manifest next to its final location and moves it into place,
+    so an interrupted build never leaves a half-written manifest behind.
+    """
+    target_dir = os.path.dirname(path)
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def plan_build(manifest, pages, template_hash, basepath, parser_version=None):
+    """
+    Decides which pages need rendering.
+
+    Args:
+        manifest: The manifest from the previous build.
+        pages: A dict of source path -> (source hash, output path).
+        template_hash: The hash of the template used for this build.
+        basepath: The basepath used for this build.
+        parser_version: The parse.PARSER_VERSION of this build; pages
+            rendered by another version may have different html.
+
+    Returns:
+        A tuple (to_build, unchanged, stale_outputs) where to_build and
+        unchanged are lists of source paths and stale_outputs is a list of
+        output paths whose sources no longer exist.
+    """
+    old_pages = manifest.get("pages", {})
+    full_rebuild = (
+        manifest.get("template") != template_hash
+        or manifest.get("basepath") != basepath
+        or manifest.get("parser_version") != parser_version
+    )
+
+    to_build = []
+    unchanged = []
+    for src_path, (src_hash, dest_path) in pages.items():
+        old = old_pages.get(src_path)
+        if (
+            full_rebuild
+            or old is None
+            or old.get("hash") != src_hash
+            or old.get("output") != dest_path
+            or old.get("output_signature") is None
+            or old.get("output_signature") != output_signature(dest_path)
+        ):
+            to_build.append(src_path)
+        else:
+            unchanged.append(src_path)
+
+    live_outputs = {dest_path for _, dest_path in pages.values()}
+    stale_outputs = []
+    for src_path, old in old_pages.items():
+        dest_path = old.get("output")
+        if src_path not in pages and dest_path and dest_path not in live_outputs:
+            stale_outputs.append(dest_path)
+
+    return to_build, unchanged, stale_outputs
@@ -0,0 +1,122 @@
+import os, tempfile
+
+from log import logger
+
+_file_mode = None
+
+def discover_pages(dir_path_content, dest_dir_path):
+    """
+    Walks the content directory and returns a sorted list of
+    (source path, output path) pairs: each .md file becomes the .html
+    file at the same relative path below dest_dir_path.
+    """
+    if not os.path.exists(dir_path_content):
+        raise ValueError(f"Source directory '{dir_path_content}' does not exist.")
+    if not os.path.isdir(dir_path_content):
+         raise ValueError(f"Source '{dir_path_content}' is not a directory.")
+
+    pages = []
+    for item in sorted(os.listdir(dir_path_content)):
+        src_path = os.path.join(dir_path_content, item)
+        dest_path = os.path.join(dest_dir_path, item.replace(".md",".html"))
+
+        if os.path.isdir(src_path):
+            pages.extend(discover_pages(src_path, dest_path))
+        elif os.path.isfile(src_path):
+            pages.append((src_path, dest_path))
+        else:
+            logger.warning(f"  Skipping item (not file or directory): {src_path}")
+    return pages
+
+def _new_file_mode():
+    # mkstemp creates files readable by the owner only; give pages the
+    # permissions a plain open() would have.
+    global _file_mode
+    if _file_mode is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        _file_mode = 0o666 & ~umask
+    return _file_mode
+
+def write_page(html, dest_path):
+    """
+    Writes a page to dest_path. html is either a string or an iterable
+    of string chunks, which are written as they are produced.
+
+    The encoded chunks are first compared against dest_path as they
+    arrive, so a page that didn't change is never written: it costs one
+    read of the old file, and dest_path keeps its mtime for rsync/CDN
+    deploys. From the first difference on, the page goes to a temporary
+    file next to dest_path (starting with the bytes that matched) and is
+    moved into place with os.replace, so a crash never leaves a
+    half-written page.
+
+    Returns:
+        True if dest_path was written, False if it was already up to date.
+    """
+    chunks = (html,) if isinstance(html, str) else html
+    try:
+        existing = open(dest_path, "rb")
+    except FileNotFoundError:
+        existing = None
+
+    out = tmp_path = None
+    try:
+        matched = 0 # bytes of existing known to equal the page so far
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            if out is None:
+                if existing is not None and existing.read(len(data)) == data:
+                    matched += len(data)
+                    continue
+                out, tmp_path = _open_temp_page(dest_path, existing, matched)
+            out.write(data)
+
+        if out is None:
+            if existing is not None and not existing.read(1):
+                return False
+            # The old page is longer, or there is none
+            out, tmp_path = _open_temp_page(dest_path, existing, matched)
+        out.close()
+        os.chmod(tmp_path, _new_file_mode())
+        os.replace(tmp_path, dest_path)
+        return True
+    except BaseException:
+        if out is not None:
+            out.close()
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if existing is not None:
+            existing.close()
+
+def _open_temp_page(dest_path, existing, prefix_bytes):
+    """
+    Opens a temporary file next to dest_path, starting with the first
+    prefix_bytes bytes of existing, the part of the old page that matched.
+
+    Returns:
+        A tuple (binary file object, temporary path)
+    """
+    target_dir = os.path.dirname(dest_path)
+    if target_dir:
+        # exist_ok, since parallel workers may race to create the same directory
+        os.makedirs(target_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=target_dir or ".", prefix=f".{os.path.basename(dest_path)}.", suffix=".tmp"
+    )
+    out = open(fd, "wb")
+    try:
+        if prefix_bytes:
+            existing.seek(0)
+            remaining = prefix_bytes
+            while remaining:
+                block = existing.read(min(remaining, 1 << 16))
+                out.write(block)
+                remaining -= len(block)
+    except BaseException:
+        out.close()
+        os.remove(tmp_path)
+        raise
+    return out, tmp_path
@@ -0,0 +1,79 @@
+import io, os, time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from itertools import repeat
+
+from log import logger
+
+def resolve_jobs(jobs):
+    """
+    Turns a --jobs value into a worker count. 0 (or None) means one
+    worker per CPU core.
+    """
+    if not jobs:
+        return os.cpu_count() or 1
+    if jobs < 0:
+        raise ValueError(f"Job count must not be negative, got {jobs}.")
+    return jobs
+
+def _run_captured(func, args):
+    """
+    Runs func(*args) in a worker, capturing anything it prints so the
+    parent can replay the logs in a fixed order.
+    """
+    buffer = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(buffer):
+        result = func(*args)
+    return os.getpid(), time.perf_counter() - start, buffer.getvalue(), result
+
+def run_parallel(func, arg_list, jobs):
+    """
+    Runs func over arg_list on a process pool.
+
+    Log output from each call is printed in the order of arg_list, so the
+    console output is the same as a serial run no matter which worker
+    finishes first.
+
+    Args:
+        func: A module-level (picklable) function.
+        arg_list: A list of argument tuples, one per call.
+        jobs: The number of worker processes.
+
+    Returns:
+        A tuple (results, worker_stats) where results follow the order of
+        arg_list and worker_stats maps a worker number to a dict with its
+        item count and busy time in seconds.
+    """
+    if not arg_list:
+        return [], {}
+
+    # A few chunks per worker keeps the load balanced without paying
+    # the pickling round trip for every single page.
+    chunksize = max(1, len(arg_list) // (jobs * 4))
+
+    results = []
+    worker_numbers = {}
+    worker_stats = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for pid, elapsed, log, result in pool.map(
+            _run_captured, repeat(func), arg_list, chunksize=chunksize
+        ):
+            print(log, end="")
+            results.append(result)
+
+            worker = worker_numbers.setdefault(pid, len(worker_numbers) + 1)
+            stats = worker_stats.setdefault(worker, {"items": 0, "seconds": 0.0})
+            stats["items"] += 1
+            stats["seconds"] += elapsed
+
+    return results, worker_stats
+
+def print_worker_stats(worker_stats, wall_seconds, unit="pages"):
+    total = sum(stats["items"] for stats in worker_stats.values())
+    for worker in sorted(worker_stats):
+        stats = worker_stats[worker]
+        rate = stats["items"] / stats["seconds"] if stats["seconds"] else 0.0
+        logger.info(f"  worker {worker}: {stats['items']} {unit} in {stats['seconds']:.3f}s ({rate:.1f} {unit}/s)")
+    rate = total / wall_seconds if wall_seconds else 0.0
+    logger.info(f"Built {total} {unit} on {len(worker_stats)} workers in {wall_seconds:.3f}s ({rate:.1f} {unit}/s)")
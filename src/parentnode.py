@@ -1,7 +1,8 @@
-from htmlnode import HTMLNode
-from textnode import TextNode, text_node_to_html_node
+from htmlnode import HTMLNode, render_chunks
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if tag is None:
             raise ValueError("ParentNode must have a tag")
@@ -10,13 +11,10 @@ class ParentNode(HTMLNode):
         super().__init__(tag, None, children, props)
     
     def to_html(self):
-        children_html = ""
-        for child in self.children:
-            if isinstance(child, TextNode):
-                children_html += text_node_to_html_node(child).to_html()
-            else:
-                children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return "".join(render_chunks(self))
+
+    def html_parts(self):
+        return f"<{self.tag}{self.props_to_html()}>", self.children, f"</{self.tag}>"
     
     def __repr__(self):
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
\ No newline at end of file
+        return f"ParentNode({self.tag}, children: {self.children}, {self._props_repr()})"
\ No newline at end of file
@@ -1,9 +1,14 @@
-import re
+import re, time
 
 from parentnode import ParentNode
-from textnode import TextNode, TextType
+from textnode import TextNode, TEXT, IMAGE, LINK, lower_text_nodes
 from leafnode import LeafNode
-from blocks import BlockType, block_to_block_type
+from blocks import BlockType, scan_blocks
+from inline import tokenize_inline
+
+# Part of the parse cache key: bump it whenever a change to parsing or
+# html rendering changes the output for the same markdown.
+PARSER_VERSION = 4
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
@@ -20,7 +25,7 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
         # Only split nodes that are currently plain text
-        if old_node.text_type != TextType.TEXT.value:
+        if old_node.text_type != TEXT:
             new_nodes.append(old_node)
             continue # Skip to the next node if it's not plain text
 
@@ -49,89 +54,64 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
             # Even indices are outside the delimiter (plain text)
             if i % 2 == 0:
-                new_nodes.append(TextNode(part, TextType.TEXT))
+                new_nodes.append(TextNode(part, TEXT))
             # Odd indices are inside the delimiter (special text type)
             else:
                 new_nodes.append(TextNode(part, text_type))
 
     return new_nodes
 
-def extract_markdown_images(text):
-    regx = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+IMAGE_REGEX = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_REGEX = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
-    return re.findall(regx, text)
+def extract_markdown_images(text):
+    return IMAGE_REGEX.findall(text)
 
 def extract_markdown_links(text):
-    regx = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-
-    return re.findall(regx, text)
+    return LINK_REGEX.findall(text)
 
-def split_nodes_image(old_nodes):
+def _split_nodes_regex(old_nodes, regex, text_type):
+    # Cuts each text node at the match positions, so the whole pass is
+    # linear in the text instead of re-splitting the remainder per match.
     new_nodes = []
-
     for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT.value:
-            new_nodes.append(old_node)
-            continue
-        
-        matches = extract_markdown_images(old_node.text)
-        
-        if len(matches) == 0:
+        if old_node.text_type != TEXT:
             new_nodes.append(old_node)
             continue
-        
+
         text = old_node.text
-        for idx, match in enumerate(matches):
-            split_text = text.split(f"![{match[0]}]({match[1]})", 1)    
+        position = 0
+        for match in regex.finditer(text):
             new_nodes.extend([
-                TextNode(split_text[0], TextType.TEXT),
-                TextNode(match[0], TextType.IMAGE, match[1]),
+                TextNode(text[position:match.start()], TEXT),
+                TextNode(match.group(1), text_type, match.group(2)),
             ])
-            text = split_text[1]
-            if len(matches) == idx + 1 and text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
-    
-    return new_nodes
+            position = match.end()
 
-def split_nodes_link(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT.value:
+        if position == 0:
             new_nodes.append(old_node)
-            continue
-        
-        matches = extract_markdown_links(old_node.text)
-        
-        if len(matches) == 0:
-            new_nodes.append(old_node)
-            continue
-        
-        text = old_node.text
-        for idx, match in enumerate(matches):
-            split_text = text.split(f"[{match[0]}]({match[1]})", 1)    
-            new_nodes.extend([
-                TextNode(split_text[0], TextType.TEXT),
-                TextNode(match[0], TextType.LINK, match[1]),
-            ])
-            text = split_text[1]
-            if len(matches) == idx + 1 and text != "":
-                new_nodes.append(TextNode(text, TextType.TEXT))
-            
+        elif position < len(text):
+            new_nodes.append(TextNode(text[position:], TEXT))
+
     return new_nodes
 
-def text_to_textnodes(text):
-    if not text:
-        return []
-    
-    nodes = [TextNode(text, TextType.TEXT)]
+def split_nodes_image(old_nodes):
+    return _split_nodes_regex(old_nodes, IMAGE_REGEX, IMAGE)
 
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+def split_nodes_link(old_nodes):
+    return _split_nodes_regex(old_nodes, LINK_REGEX, LINK)
+
+def text_to_textnodes(text):
+    """
+    Splits a line of inline markdown into nodes with
+    inline.tokenize_inline.
 
-    return nodes
+    Flat bold, italic, code, link and image spans are TextNodes, the same
+    as split_nodes_delimiter/image/link give for them. Nested spans are
+    TextNodes with children, and unclosed delimiters are kept as literal
+    text.
+    """
+    return tokenize_inline(text)
 
 def markdown_to_blocks(markdown):
     """
@@ -164,28 +144,115 @@ def markdown_to_blocks(markdown):
 
     return cleaned_blocks
 
-def markdown_to_html_node(md):
-    children_nodes = []
+def markdown_to_html_node(md, profile=None):
+    """
+    Parses a markdown document into a div ParentNode.
+
+    If profile (a profiling.PageProfile) is given, the time spent
+    scanning and classifying blocks and building their nodes (inline
+    parsing included) is added to it.
+    """
+    return blocks_to_html_node(scan_blocks(md.split("\n")), profile)
 
-    blocks = markdown_to_blocks(md)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.HEADING.value:
-            children_nodes.append(convert_md_header_to_html(block))
-        if block_type == BlockType.QUOTE.value:
-            children_nodes.append(convert_md_blockquote_to_html(block))
-        if block_type == BlockType.UNORDERED_LIST.value:
-            children_nodes.append(convert_md_unordered_list_to_html(block))
-        if block_type == BlockType.ORDERED_LIST.value:
-            children_nodes.append(convert_md_ordered_list_to_html(block))
-        if block_type == BlockType.CODE.value:
-            children_nodes.append(convert_md_code_block_to_html(block))
-        if block_type == BlockType.PARAGRAPH.value:
-            children_nodes.append(convert_md_paragraph_to_html(block))
+def blocks_to_html_node(blocks, profile=None):
+    """
+    Builds the div ParentNode for an iterable of (block type, lines)
+    tuples as yielded by blocks.scan_blocks.
+    """
+    children_nodes = []
+    clock = time.perf_counter
+    scan_seconds = inline_seconds = 0.0
+
+    blocks = iter(blocks)
+    while True:
+        scan_start = clock()
+        block = next(blocks, None)
+        inline_start = clock()
+        scan_seconds += inline_start - scan_start
+        if block is None:
+            break
+        block_type, lines = block
+        children_nodes.append(block_to_html_node(block_type, lines))
+        inline_seconds += clock() - inline_start
+
+    if profile is not None:
+        profile.add("scan_blocks", scan_seconds)
+        profile.add("inline", inline_seconds)
 
     return ParentNode("div", children_nodes, None)
 
+def iter_markdown_html(lines, profile=None):
+    """
+    Yields the html of a markdown document one block at a time, the same
+    html markdown_to_html_node(...).to_html() returns in one piece.
+
+    lines can be a lazily read file, so only the current block is ever
+    held in memory. Phases are timed into profile as in
+    blocks_to_html_node, plus to_html for rendering each block.
+    """
+    clock = time.perf_counter
+    scan_seconds = inline_seconds = to_html_seconds = 0.0
+
+    yield "<div>"
+    blocks = scan_blocks(lines)
+    while True:
+        scan_start = clock()
+        block = next(blocks, None)
+        inline_start = clock()
+        scan_seconds += inline_start - scan_start
+        if block is None:
+            break
+        node = block_to_html_node(*block)
+        to_html_start = clock()
+        html = node.to_html()
+        to_html_done = clock()
+        inline_seconds += to_html_start - inline_start
+        to_html_seconds += to_html_done - to_html_start
+        yield html
+    yield "</div>"
+
+    if profile is not None:
+        profile.add("scan_blocks", scan_seconds)
+        profile.add("inline", inline_seconds)
+        profile.add("to_html", to_html_seconds)
+
+def block_to_html_node(block_type, lines):
+    return BLOCK_BUILDERS[block_type](lines)
+
+def heading_lines_to_html(lines):
+    return convert_md_header_to_html(lines[0])
+
+def blockquote_lines_to_html(lines):
+    new_lines = [line.split(" ", 1)[1] if " " in line else "" for line in lines]
+    return LeafNode("blockquote", "\n".join(new_lines), None)
+
+def list_lines_to_html(tag, lines):
+    child_nodes = []
+    for line in lines:
+        nodes = lower_text_nodes(text_to_textnodes(line.split(" ", 1)[1]))
+        child_nodes.append(ParentNode("li", nodes, None))
+
+    return ParentNode(tag, child_nodes, None)
+
+def paragraph_lines_to_html(lines):
+    return ParentNode("p", lower_text_nodes(text_to_textnodes(" ".join(lines))), None)
+
+def code_lines_to_html(lines):
+    # lines[0] is the opening fence. Its info string stays in the output as
+    # the first line, as it always has.
+    language = lines[0].lstrip("`")
+    code = "\n".join([language, *lines[1:]] if language else lines[1:])
+    return ParentNode("pre", [LeafNode("code", code, None)], None)
+
+BLOCK_BUILDERS = {
+    BlockType.HEADING.value: heading_lines_to_html,
+    BlockType.QUOTE.value: blockquote_lines_to_html,
+    BlockType.UNORDERED_LIST.value: lambda lines: list_lines_to_html("ul", lines),
+    BlockType.ORDERED_LIST.value: lambda lines: list_lines_to_html("ol", lines),
+    BlockType.CODE.value: code_lines_to_html,
+    BlockType.PARAGRAPH.value: paragraph_lines_to_html,
+}
+
 def convert_md_header_to_html(md):
     split = md.split(' ', 1)
     hash_count = len(split[0])
@@ -193,41 +260,16 @@ def convert_md_header_to_html(md):
     return LeafNode(f"h{hash_count}", split[1], None)
 
 def convert_md_blockquote_to_html(md):
-    lines = md.split("\n")
-    new_lines = []
-    for line in lines:
-        clean_line = line.split(' ', 1)[1] if len(line.split(' ')) != 1 else ""
-        new_lines.append(clean_line)
-    
-    new_lines = "\n".join(new_lines)
-
-    return LeafNode("blockquote", new_lines, None)
+    return blockquote_lines_to_html(md.split("\n"))
 
 def convert_md_unordered_list_to_html(md):
-    lines = md.split("\n")
-    child_nodes = []
-    for line in lines:
-        clean_line = line.split(' ', 1)[1]
-        text_nodes = text_to_textnodes(clean_line)
-        child_nodes.append(ParentNode("li", text_nodes, None))
-    
-    return ParentNode("ul", child_nodes, None)
+    return list_lines_to_html("ul", md.split("\n"))
 
 def convert_md_ordered_list_to_html(md):
-    lines = md.split("\n")
-    child_nodes = []
-    for line in lines:
-        clean_line = line.split(' ', 1)[1]
-        text_nodes = text_to_textnodes(clean_line)
-        child_nodes.append(ParentNode("li", text_nodes, None))
-    
-    return ParentNode("ol", child_nodes, None)
+    return list_lines_to_html("ol", md.split("\n"))
 
 def convert_md_paragraph_to_html(md):
-    line = " ".join(md.split("\n"))
-    text_nodes = text_to_textnodes(line)
-
-    return ParentNode("p", text_nodes, None)
+    return paragraph_lines_to_html(md.split("\n"))
 
 def convert_md_code_block_to_html(md):
     md = md.lstrip('```').rstrip('```')
@@ -239,7 +281,9 @@ def convert_md_code_block_to_html(md):
     return ParentNode("pre", child_nodes, None)
 
 def extract_title(markdown):
-    lines = markdown.split("\n")
+    return extract_title_from_lines(markdown.split("\n"))
+
+def extract_title_from_lines(lines):
     for line in lines:
         if line.startswith("# "):
-            return line.split(" ", 1)[1].strip()
\ No newline at end of file
+            return line.split(" ", 1)[1].strip()
@@ -0,0 +1,98 @@
+import json, os
+
+# Build phases, in pipeline order
+PHASES = (
+    "discovery",
+    "read",
+    "scan_blocks",
+    "inline",
+    "to_html",
+    "template",
+    "write",
+)
+
+class PageProfile():
+    """
+    Wall time spent in each phase while generating a single page.
+    Instances are returned from --jobs workers, so they stay picklable.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.timings = {}
+
+    def add(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def __repr__(self):
+        return f"PageProfile({self.path}, {self.timings})"
+
+class BuildProfile():
+    """
+    Collects the per-page profiles of a build plus build-wide phases
+    such as discovery.
+    """
+    def __init__(self):
+        self.timings = {}
+        self.pages = []
+
+    def add(self, phase, seconds):
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def add_page(self, page_profile):
+        self.pages.append(page_profile)
+        for phase, seconds in page_profile.timings.items():
+            self.add(phase, seconds)
+
+    def slowest_pages(self, limit=None):
+        pages = sorted(self.pages, key=lambda page: (-page.total, page.path))
+        return pages if limit is None else pages[:limit]
+
+    def report(self, limit=20):
+        """
+        Returns a plain-text report: phase totals followed by a table of
+        the slowest pages.
+        """
+        lines = ["Phase totals:"]
+        total = sum(self.timings.values())
+        for phase in PHASES:
+            seconds = self.timings.get(phase, 0.0)
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {phase:<20}{seconds * 1000:>12.3f}ms {share:>6.1f}%")
+        lines.append(f"  {'total':<20}{total * 1000:>12.3f}ms")
+
+        lines.append("")
+        lines.append(f"Slowest pages ({min(limit, len(self.pages))} of {len(self.pages)}):")
+        header = f"  {'total ms':>10}" + "".join(f"{phase[:10]:>11}" for phase in PHASES[1:]) + "  page"
+        lines.append(header)
+        for page in self.slowest_pages(limit):
+            row = f"  {page.total * 1000:>10.3f}"
+            row += "".join(f"{page.timings.get(phase, 0.0) * 1000:>11.3f}" for phase in PHASES[1:])
+            lines.append(f"{row}  {page.path}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "phases": {phase: self.timings.get(phase, 0.0) for phase in PHASES},
+            "pages": {
+                page.path: {
+                    "total": page.total,
+                    "phases": {phase: page.timings.get(phase, 0.0) for phase in PHASES[1:]},
+                }
+                for page in self.slowest_pages()
+            },
+        }
+
+    def save(self, path):
+        """
+        Writes the profile as JSON, with stable key order so two runs can
+        be compared with a plain diff.
+        """
+        target_dir = os.path.dirname(path)
+        if target_dir:
+            os.makedirs(target_dir, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
@@ -0,0 +1,194 @@
+import os, shutil
+
+from log import logger
+from manifest import hash_file
+
+def new_sync_stats():
+    return {
+        "copied": 0,
+        "copied_bytes": 0,
+        "linked": 0,
+        "skipped": 0,
+        "skipped_bytes": 0,
+        "removed": 0,
+    }
+
+def remove_empty_dirs(dir_path, stop_dir):
+    """
+    Removes dir_path and its parents while they are empty, never going
+    above stop_dir.
+    """
+    stop_dir = os.path.normpath(stop_dir)
+    dir_path = os.path.normpath(dir_path)
+    while dir_path != stop_dir and dir_path.startswith(stop_dir + os.sep):
+        if os.listdir(dir_path):
+            break
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+def list_files(src_dir):
+    """
+    Returns a dict of path relative to src_dir -> os.stat_result for every
+    regular file below src_dir, using os.scandir so each file is stat'ed once.
+    """
+    files = {}
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(os.path.join(src_dir, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = os.path.join(rel_dir, entry.name)
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(rel_path)
+                elif entry.is_file():
+                    files[rel_path] = entry.stat()
+                else:
+                    logger.warning(f"  Skipping item (not file or directory): {entry.path}")
+    return files
+
+def is_up_to_date(src_path, src_stat, dest_path, checksum=False):
+    """
+    Checks whether dest_path already holds the contents of src_path.
+
+    By default a matching size and mtime is trusted, like rsync does.
+    With checksum=True a size match is confirmed by hashing both files.
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if os.path.samestat(src_stat, dest_stat):
+        return True # dest is a hardlink to src
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src_path) == hash_file(dest_path)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+def _copy_file_range(src_path, dest_path, size):
+    with open(src_path, "rb") as fsrc, open(dest_path, "wb") as fdst:
+        offset = 0
+        while offset < size:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset)
+            if copied == 0:
+                break
+            offset += copied
+
+def copy_file(src_path, dest_path, size, hardlink=False):
+    """
+    Puts a copy of src_path at dest_path.
+
+    Tries a hardlink (when allowed), then an in-kernel os.copy_file_range,
+    then falls back to shutil.copyfile. The file is prepared under a
+    temporary name and moved into place, so dest_path is never truncated
+    in place, which matters when it is a hardlink to the source.
+
+    Returns:
+        True if the file was hardlinked, False if its bytes were copied.
+    """
+    tmp_path = f"{dest_path}.sync-tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+
+    if hardlink:
+        try:
+            os.link(src_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return True
+        except OSError:
+            pass # e.g. across devices, or a filesystem without hardlinks
+
+    try:
+        if not hasattr(os, "copy_file_range"):
+            raise OSError("copy_file_range is not available")
+        _copy_file_range(src_path, tmp_path, size)
+    except OSError:
+        shutil.copyfile(src_path, tmp_path)
+    shutil.copystat(src_path, tmp_path) # keeps mtime, so the next sync can skip it
+    os.replace(tmp_path, dest_path)
+    return False
+
+def sync_tree(src_dir, dest_dir, previous=(), checksum=False, hardlink=False):
+    """
+    Makes dest_dir mirror the files in src_dir, only copying files that
+    changed.
+
+    dest_dir also holds generated pages, so only files listed in previous
+    (the static files of the last sync) are ever deleted.
+
+    Args:
+        src_dir: The static source directory.
+        dest_dir: The output directory.
+        previous: Relative paths synced by the previous run.
+        checksum: Compare file hashes instead of trusting size and mtime.
+        hardlink: Try to hardlink files instead of copying them.
+
+    Returns:
+        A tuple (synced, stats) where synced is the sorted list of relative
+        paths now mirrored in dest_dir and stats counts what was done.
+    """
+    if not os.path.exists(src_dir):
+        raise ValueError(f"Source directory '{src_dir}' does not exist.")
+    if not os.path.isdir(src_dir):
+         raise ValueError(f"Source '{src_dir}' is not a directory.")
+
+    stats = new_sync_stats()
+    files = list_files(src_dir)
+
+    for rel_path in sorted(files):
+        src_stat = files[rel_path]
+        src_path = os.path.join(src_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+
+        if is_up_to_date(src_path, src_stat, dest_path, checksum):
+            stats["skipped"] += 1
+            stats["skipped_bytes"] += src_stat.st_size
+            continue
+
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        logger.debug(f"  Copying file: {src_path} -> {dest_path}")
+        if copy_file(src_path, dest_path, src_stat.st_size, hardlink):
+            stats["linked"] += 1
+        else:
+            stats["copied"] += 1
+            stats["copied_bytes"] += src_stat.st_size
+
+    for rel_path in sorted(set(previous) - set(files)):
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.isfile(dest_path):
+            logger.debug(f"  Removing stale file: {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_dir)
+            stats["removed"] += 1
+
+    return sorted(files), stats
+
+def prune_tree(dest_dir, keep):
+    """
+    Removes every file below dest_dir whose path relative to dest_dir is
+    not in keep, along with the directories that leaves empty.
+
+    Returns:
+        The number of files removed.
+    """
+    if not os.path.isdir(dest_dir):
+        return 0
+    removed = 0
+    for rel_path in sorted(list_files(dest_dir)):
+        if rel_path in keep:
+            continue
+        dest_path = os.path.join(dest_dir, rel_path)
+        logger.debug(f"  Removing stale file: {dest_path}")
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path), dest_dir)
+        removed += 1
+    return removed
+
+def format_sync_stats(stats):
+    return (
+        f"{stats['copied']} copied ({stats['copied_bytes']} bytes), "
+        f"{stats['linked']} linked, "
+        f"{stats['skipped']} skipped ({stats['skipped_bytes']} bytes), "
+        f"{stats['removed']} removed"
+    )
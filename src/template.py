@@ -0,0 +1,131 @@
+import os, re
+
+SLOT_REGEX = re.compile(r"\{\{ (\w+) \}\}")
+BASEPATH_REGEX = re.compile(r'(?:href|src)="/')
+# Longest prefix of a basepath pattern that could end one chunk and
+# continue in the next
+BASEPATH_CARRY = len('href="/') - 1
+
+_template_cache = {}
+
+def rewrite_basepath(html, basepath):
+    """
+    Points root-relative href/src attributes at the basepath the site is
+    served from, e.g. href="/x" -> href="/blog/x" for basepath "blog".
+    """
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="/{basepath}/')
+    html = html.replace('src="/', f'src="/{basepath}/')
+    return html
+
+def rewrite_basepath_stream(chunks, basepath):
+    """
+    Applies rewrite_basepath to a stream of chunks, giving the same result
+    as rewriting their concatenation. A short tail of each chunk is held
+    back so a pattern split across two chunks is still rewritten.
+    """
+    if basepath == "/":
+        yield from chunks
+        return
+
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        cut = len(text) - BASEPATH_CARRY
+        if cut <= 0:
+            carry = text
+            continue
+        # Never cut through a match that starts before the cut
+        for match in BASEPATH_REGEX.finditer(text, max(0, cut - BASEPATH_CARRY)):
+            if match.start() < cut:
+                cut = max(cut, match.end())
+        yield rewrite_basepath(text[:cut], basepath)
+        carry = text[cut:]
+    if carry:
+        yield rewrite_basepath(carry, basepath)
+
+class Template():
+    """
+    A page template compiled into static chunks and named slots.
+
+    The basepath rewrite is applied to the static chunks once, here, so
+    rendering a page is a single join over the pre-split parts.
+    """
+    def __init__(self, source, basepath="/"):
+        self.basepath = basepath
+        self.parts = []
+        self.slots = {}
+
+        position = 0
+        for match in SLOT_REGEX.finditer(source):
+            self.parts.append(rewrite_basepath(source[position:match.start()], basepath))
+            self.slots.setdefault(match.group(1), []).append(len(self.parts))
+            # Unfilled slots keep their placeholder text, as str.replace did
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(rewrite_basepath(source[position:], basepath))
+
+    def render_parts(self, **values):
+        """
+        Returns the list of chunks making up the page, with each slot
+        filled from values. Slot values are basepath-rewritten too, since
+        markdown links are written root-relative.
+        """
+        parts = list(self.parts)
+        for name, value in values.items():
+            value = rewrite_basepath(value, self.basepath)
+            for index in self.slots.get(name, ()):
+                parts[index] = value
+        return parts
+
+    def render(self, **values):
+        return "".join(self.render_parts(**values))
+
+    def iter_render(self, **values):
+        """
+        Yields the page chunk by chunk. A slot value may be a string or an
+        iterable of string chunks (e.g. HTMLNode.iter_html()), which is
+        streamed through without being joined first.
+        """
+        slot_at = {}
+        for name, value in values.items():
+            indexes = self.slots.get(name, ())
+            if not isinstance(value, str) and len(indexes) > 1:
+                value = "".join(value) # an iterator can only be consumed once
+            for index in indexes:
+                slot_at[index] = value
+
+        for index, part in enumerate(self.parts):
+            value = slot_at.get(index)
+            if value is None:
+                yield part
+            elif isinstance(value, str):
+                yield rewrite_basepath(value, self.basepath)
+            else:
+                yield from rewrite_basepath_stream(value, self.basepath)
+
+    def write(self, fp, **values):
+        for chunk in self.iter_render(**values):
+            fp.write(chunk)
+
+    def __repr__(self):
+        return f"Template(slots: {sorted(self.slots)}, {self.basepath})"
+
+def load_template(template_path, basepath="/"):
+    """
+    Returns the compiled Template for template_path, reading and compiling
+    the file only when it changed since the last call in this process.
+    """
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), basepath)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(template_path) as f:
+        template = Template(f.read(), basepath)
+    _template_cache[key] = (signature, template)
+    return template
@@ -1,6 +1,6 @@
 import unittest
 # Assuming your code is in 'blocks.py' in the same directory
-from blocks import block_to_block_type, BlockType
+from blocks import block_to_block_type, scan_blocks, BlockType
 
 class TestBlockToBlockType(unittest.TestCase):
 
@@ -100,6 +100,78 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type(empty_string), BlockType.PARAGRAPH.value)
         self.assertEqual(block_to_block_type(whitespace_string), BlockType.PARAGRAPH.value)
 
+class TestAdversarialBlocks(unittest.TestCase):
+    # These used to backtrack; with linear checks they return immediately
+    def test_long_whitespace_heading(self):
+        self.assertEqual(block_to_block_type("#" + " " * 200000 + "x"), BlockType.HEADING.value)
+        self.assertEqual(block_to_block_type("#" + " " * 200000 + "x\ny"), BlockType.PARAGRAPH.value)
+
+    def test_unterminated_fence(self):
+        self.assertEqual(block_to_block_type("```\n" + "x = 1\n" * 100000), BlockType.PARAGRAPH.value)
+        self.assertEqual(block_to_block_type("```\n" + "x = 1\n" * 100000 + "```"), BlockType.CODE.value)
+
+    def test_long_lists_and_quotes(self):
+        self.assertEqual(block_to_block_type("- item\n" * 100000), BlockType.UNORDERED_LIST.value)
+        self.assertEqual(
+            block_to_block_type("\n".join(f"{i}. item" for i in range(1, 10001))),
+            BlockType.ORDERED_LIST.value,
+        )
+        self.assertEqual(block_to_block_type("> line\n" * 100000), BlockType.QUOTE.value)
+
+class TestScanBlocks(unittest.TestCase):
+    def scan(self, md):
+        return list(scan_blocks(md.split("\n")))
+
+    def test_blocks_match_block_to_block_type(self):
+        md = "# Title\n\n> a\n> b\n\n- x\n* y\n\n3. c\n4. d\n\nplain\ntext"
+        self.assertEqual(
+            self.scan(md),
+            [
+                (BlockType.HEADING.value, ["# Title"]),
+                (BlockType.QUOTE.value, ["> a", "> b"]),
+                (BlockType.UNORDERED_LIST.value, ["- x", "* y"]),
+                (BlockType.ORDERED_LIST.value, ["3. c", "4. d"]),
+                (BlockType.PARAGRAPH.value, ["plain", "text"]),
+            ],
+        )
+        for block_type, lines in self.scan(md):
+            self.assertEqual(block_to_block_type("\n".join(lines)), block_type)
+
+    def test_falls_back_to_paragraph(self):
+        self.assertEqual(
+            self.scan("- a\nb\n\n1. a\n3. b\n\n# a\nb\n\n> a\nb"),
+            [
+                (BlockType.PARAGRAPH.value, ["- a", "b"]),
+                (BlockType.PARAGRAPH.value, ["1. a", "3. b"]),
+                (BlockType.PARAGRAPH.value, ["# a", "b"]),
+                (BlockType.PARAGRAPH.value, ["> a", "b"]),
+            ],
+        )
+
+    def test_whitespace_only_lines_do_not_split_blocks(self):
+        self.assertEqual(
+            self.scan("  a  \n   \n b\n\n\n\nc"),
+            [
+                (BlockType.PARAGRAPH.value, ["a", "b"]),
+                (BlockType.PARAGRAPH.value, ["c"]),
+            ],
+        )
+
+    def test_fence_keeps_blank_lines(self):
+        self.assertEqual(
+            self.scan("```py\na = 1\n\n\nb = 2\n```\nafter"),
+            [
+                (BlockType.CODE.value, ["```py", "a = 1", "", "", "b = 2"]),
+                (BlockType.PARAGRAPH.value, ["after"]),
+            ],
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        self.assertEqual(
+            self.scan("```\ncode\n\n# not a heading"),
+            [(BlockType.CODE.value, ["```", "code", "", "# not a heading"])],
+        )
+
 # Standard boilerplate to run tests
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+import unittest, os
+
+from cache import ParseCache
+from fixtures import TempDirTestCase
+from leafnode import LeafNode
+from textnode import TEXT_RENDERERS, TextType, register_text_renderer
+from main import generate_page
+
+class TestParseCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.path("cache")
+
+    def test_miss_then_hit(self):
+        cache = ParseCache(self.cache_dir)
+        self.assertIsNone(cache.get("# Hi"))
+        cache.put("# Hi", "Hi", "<div><h1>Hi</h1></div>")
+        self.assertEqual(cache.get("# Hi"), ("Hi", "<div><h1>Hi</h1></div>"))
+        self.assertEqual((cache.hits, cache.misses, cache.writes), (1, 1, 1))
+        self.assertEqual(cache.hit_rate(), 0.5)
+
+    def test_key_depends_on_content(self):
+        cache = ParseCache(self.cache_dir)
+        self.assertNotEqual(cache.key("# A"), cache.key("# B"))
+        self.assertEqual(cache.key("# A"), ParseCache(self.cache_dir).key("# A"))
+
+    def test_custom_renderers_bypass_the_cache(self):
+        cache = ParseCache(self.cache_dir)
+        cache.put("# Hi", "Hi", "<div><h1>Hi</h1></div>")
+        renderers = dict(TEXT_RENDERERS)
+        try:
+            register_text_renderer(TextType.BOLD, lambda node: LeafNode("strong", node.text))
+            self.assertIsNone(cache.get("# Hi"))
+            cache.put("# Bye", "Bye", "<div><h1>Bye</h1></div>")
+        finally:
+            TEXT_RENDERERS.clear()
+            TEXT_RENDERERS.update(renderers)
+        self.assertEqual(cache.get("# Hi"), ("Hi", "<div><h1>Hi</h1></div>"))
+        self.assertIsNone(cache.get("# Bye"))
+        self.assertEqual(cache.writes, 1)
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ParseCache(self.cache_dir)
+        cache.put("# Hi", "Hi", "<h1>Hi</h1>")
+        with open(cache.path(cache.key("# Hi")), "w") as f:
+            f.write("{broken")
+        self.assertIsNone(cache.get("# Hi"))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = ParseCache(self.cache_dir)
+        for i, source in enumerate(("# A", "# B", "# C")):
+            cache.put(source, source, "x" * 100)
+            os.utime(cache.path(cache.key(source)), ns=(i, i))
+        cache.get("# A") # touching A makes B the oldest entry
+
+        entry_size = os.path.getsize(cache.path(cache.key("# A")))
+        cache.max_bytes = entry_size * 2
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNone(cache.get("# B"))
+        self.assertIsNotNone(cache.get("# A"))
+        self.assertIsNotNone(cache.get("# C"))
+
+    def test_generate_page_uses_cache(self):
+        source = self.write("index.md", "# Hello\n\nSome **bold** text.")
+        template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        dest = self.path("docs", "index.html")
+
+        generate_page("/", source, template, dest)
+        with open(dest) as f:
+            expected = f.read()
+
+        cache = ParseCache(self.cache_dir)
+        generate_page("/", source, template, dest, cache=cache)
+        generate_page("/", source, template, dest, cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        with open(dest) as f:
+            self.assertEqual(f.read(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
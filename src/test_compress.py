@@ -0,0 +1,77 @@
+import unittest, gzip, os
+
+from compress import compress_file, compress_tree, format_compress_stats, sidecar_path
+from fixtures import TempDirTestCase
+
+PAGE = "<html><body>" + "<p>Some repeated paragraph text.</p>" * 50 + "</body></html>"
+
+class TestCompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = self.path("docs")
+        self.page = self.write("docs/index.html", PAGE)
+
+    def compress_tree(self, jobs=1, static_files=()):
+        return compress_tree(self.root, jobs, static_files)
+
+    def test_writes_sidecar_with_source_mtime(self):
+        status, size, compressed_size = compress_file(self.page)
+        self.assertEqual((status, size), ("written", len(PAGE)))
+        gz_path = sidecar_path(self.page)
+        with open(gz_path, "rb") as f:
+            data = f.read()
+        self.assertEqual(gzip.decompress(data).decode(), PAGE)
+        self.assertEqual(compressed_size, len(data))
+        self.assertEqual(os.stat(gz_path).st_mtime_ns, os.stat(self.page).st_mtime_ns)
+
+    def test_only_changed_sources_are_recompressed(self):
+        compress_file(self.page)
+        self.assertEqual(compress_file(self.page)[0], "unchanged")
+        self.write("docs/index.html", PAGE + "<p>new</p>", mtime_ns=10**18)
+        self.assertEqual(compress_file(self.page)[0], "written")
+        with gzip.open(sidecar_path(self.page), "rt") as f:
+            self.assertTrue(f.read().endswith("<p>new</p>"))
+
+    def test_small_sources_lose_their_sidecar(self):
+        compress_file(self.page)
+        self.write("docs/index.html", "<p>tiny</p>", mtime_ns=10**18)
+        self.assertEqual(compress_file(self.page)[0], "skipped")
+        self.assertFalse(os.path.exists(sidecar_path(self.page)))
+
+    def test_compress_tree(self):
+        self.write("docs/index.css", "body { color: red; }\n" * 40)
+        self.write("docs/images/tom.png", "PNG" * 200)
+        self.write("docs/old/gone.html.gz", "stale")
+        self.write("docs/archive.tar.gz", "not a sidecar")
+
+        stats = self.compress_tree()
+        self.assertEqual((stats["written"], stats["removed"]), (2, 1))
+        self.assertTrue(os.path.exists(sidecar_path(os.path.join(self.root, "index.css"))))
+        self.assertFalse(os.path.exists(sidecar_path(os.path.join(self.root, "images/tom.png"))))
+        self.assertTrue(os.path.exists(os.path.join(self.root, "archive.tar.gz")))
+        self.assertIn("2 written", format_compress_stats(stats))
+
+        stats = self.compress_tree()
+        self.assertEqual((stats["written"], stats["unchanged"]), (0, 2))
+
+    def test_static_gz_files_are_left_alone(self):
+        self.write("docs/sitemap.xml.gz", "static asset")
+        self.write("docs/feed.xml", "<rss></rss>" * 40)
+        self.write("docs/feed.xml.gz", "static asset")
+        stats = self.compress_tree(static_files=["sitemap.xml.gz", "feed.xml", "feed.xml.gz"])
+        self.assertEqual((stats["written"], stats["removed"]), (1, 0))
+        for name in ("sitemap.xml.gz", "feed.xml.gz"):
+            with open(os.path.join(self.root, name)) as f:
+                self.assertEqual(f.read(), "static asset")
+
+    def test_compress_tree_in_parallel(self):
+        for i in range(4):
+            self.write(f"docs/page{i}.html", PAGE + str(i))
+        stats = self.compress_tree(jobs=2)
+        self.assertEqual(stats["written"], 5)
+        with gzip.open(sidecar_path(os.path.join(self.root, "page3.html")), "rt") as f:
+            self.assertEqual(f.read(), PAGE + "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
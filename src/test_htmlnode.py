@@ -1,6 +1,8 @@
 import unittest
 
 from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_eq(self):
@@ -19,6 +21,48 @@ class TestHTMLNode(unittest.TestCase):
         target_html = ' href="https://www.google.com" target="_blank"'
         self.assertEqual(node.props_to_html(), target_html)
 
+    def test_props_values_are_escaped(self):
+        node = LeafNode("img", "", {"src": "/a?b=1&c=2", "alt": 'Say "hi" <3'})
+        self.assertEqual(
+            node.to_html(),
+            '<img src="/a?b=1&amp;c=2" alt="Say &quot;hi&quot; &lt;3"></img>',
+        )
+
+    def test_equal_props_share_one_string(self):
+        first = LeafNode("a", "x", {"href": "/shared"})
+        second = ParentNode("a", [], {"href": "/shared"})
+        self.assertIs(first.props_to_html(), second.props_to_html())
+        self.assertIs(HTMLNode("p").props_to_html(), HTMLNode("p", props={}).props_to_html())
+
+    def test_assigning_props_updates_attributes(self):
+        node = LeafNode("a", "x", {"href": "/old"})
+        node.props = {"href": "/new"}
+        self.assertEqual(node.to_html(), '<a href="/new">x</a>')
+        node.props = None
+        self.assertEqual(node.to_html(), "<a>x</a>")
+
+    def test_props_are_read_only(self):
+        node = LeafNode("a", "x", {"href": "/a"})
+        with self.assertRaises(TypeError):
+            node.props["href"] = "/b"
+        self.assertIs(node.props, node.props)
+        self.assertEqual(node.props, {"href": "/a"})
+        self.assertEqual(node.to_html(), '<a href="/a">x</a>')
+        self.assertEqual(repr(node), "LeafNode(a, x, {'href': '/a'})")
+
+    def test_equal_values_of_other_types_are_not_shared(self):
+        self.assertEqual(HTMLNode("p", props={"width": 1}).props_to_html(), ' width="1"')
+        self.assertEqual(HTMLNode("p", props={"width": True}).props_to_html(), ' width="True"')
+        self.assertEqual(HTMLNode("p", props={"width": 1.0}).props_to_html(), ' width="1.0"')
+
+    def test_unhashable_props_values(self):
+        node = HTMLNode("p", props={"class": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), ' class="[\'a\', \'b\']"')
+
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"), type(node).__name__)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+import unittest, os, random
+
+from inline import tokenize_inline
+from parse import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+)
+from blocks import BlockType, scan_blocks
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "content")
+
+# Flat markup: no span inside another and every delimiter closed. On
+# these the nested parser must agree with the old five-pass pipeline.
+CORPUS = [
+    "",
+    "plain text",
+    "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+    "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png) and another ![second image](https://i.imgur.com/3elNhQu.png)",
+    "This is text with a [link](https://boot.dev) and [another](https://youtube.com)",
+    "![only](image.png)",
+    "[only](link)",
+    "**bold**![img](a.png)[link](b)",
+    "![a](b)![c](d)",
+    "[a](b)[c](d) tail",
+    "x***y***z",
+    "****",
+    "![a*b](c*d) and [e*](f*)",
+    "!![a](b) ![c](d(e)) [f](g)",
+    "text ![a](b) more [c](d) end",
+]
+
+def five_pass_text_to_textnodes(text):
+    """The pipeline text_to_textnodes used before the single-pass lexer."""
+    if not text:
+        return []
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+def content_lines():
+    for dir_path, _, file_names in os.walk(CONTENT_DIR):
+        for name in file_names:
+            with open(os.path.join(dir_path, name)) as f:
+                for block_type, lines in scan_blocks(f.read().split("\n")):
+                    if block_type != BlockType.CODE.value:
+                        yield " ".join(lines)
+                        yield from lines
+
+class TestTokenizeInline(unittest.TestCase):
+    def assertSameAsFivePass(self, text):
+        # The old passes left empty text nodes before images and links
+        expected = [
+            node for node in five_pass_text_to_textnodes(text)
+            if node.text or node.text_type != TextType.TEXT.value
+        ]
+        self.assertEqual(tokenize_inline(text), expected, repr(text))
+
+    def html(self, text):
+        return ParentNode("p", tokenize_inline(text)).to_html()
+
+    def test_corpus(self):
+        for text in CORPUS:
+            self.assertSameAsFivePass(text)
+
+    def test_content_pages(self):
+        for text in content_lines():
+            self.assertSameAsFivePass(text)
+
+    def test_random_flat_markup(self):
+        rng = random.Random(0)
+        pieces = [
+            "plain ", "word", "**bold words**", "_it_", "`code`", "[link](/u)", "![img](/i.png)",
+            " ", "!", "(", ")", "]",
+        ]
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertSameAsFivePass(text)
+
+    def test_nested_emphasis(self):
+        self.assertEqual(self.html("**bold _and italic_**"), "<p><b>bold <i>and italic</i></b></p>")
+        self.assertEqual(self.html("_a **b** c_"), "<p><i>a <b>b</b> c</i></p>")
+
+    def test_markup_inside_links(self):
+        self.assertEqual(
+            self.html("[**bold** `code`](/x) and **[link](/y)**"),
+            '<p><a href="/x"><b>bold</b> <code>code</code></a> and <b><a href="/y">link</a></b></p>',
+        )
+
+    def test_code_spans_are_literal(self):
+        self.assertEqual(
+            tokenize_inline("`a_b **c**` d"),
+            [TextNode("a_b **c**", TextType.CODE), TextNode(" d", TextType.TEXT)],
+        )
+
+    def test_links_do_not_nest(self):
+        self.assertEqual(self.html("[a [b](c)](d)"), '<p>[a <a href="c">b</a>](d)</p>')
+
+    def test_unclosed_delimiters_are_literal(self):
+        self.assertEqual(tokenize_inline("a _b **c"), [TextNode("a _b **c", TextType.TEXT)])
+        self.assertEqual(self.html("**a _b** c_"), "<p><b>a _b</b> c_</p>")
+        self.assertEqual(self.html("snake_case [not a link] `tick"), "<p>snake_case [not a link] `tick</p>")
+
+    def test_pathological_input(self):
+        count = 5000
+        self.assertEqual(self.html("_**" * 3 * count), "<p>" + "<i>**</i><b>_</b>" * count + "</p>")
+        self.assertEqual(self.html("[" * count + "_" * (2 * count + 1)), "<p>" + "[" * count + "_</p>")
+        self.assertEqual(self.html("[" * count + "](u)"), "<p>" + "[" * (count - 1) + '<a href="u"></a></p>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+
+from fixtures import TempDirTestCase
+from manifest import hash_file, load_manifest, save_manifest, plan_build, empty_manifest, output_signature
+
+class TestManifest(TempDirTestCase):
+    def test_hash_file_changes_with_content(self):
+        path = self.write("a.md", "# One")
+        first = hash_file(path)
+        self.write("a.md", "# Two")
+        self.assertNotEqual(first, hash_file(path))
+
+    def test_load_missing_manifest(self):
+        manifest = load_manifest(self.path("missing.json"))
+        self.assertEqual(manifest, empty_manifest())
+
+    def test_load_corrupt_manifest(self):
+        path = self.write("manifest.json", "{not json")
+        self.assertEqual(load_manifest(path), empty_manifest())
+
+    def test_save_and_load_roundtrip(self):
+        path = self.path("manifest.json")
+        manifest = empty_manifest()
+        manifest["template"] = "abc"
+        save_manifest(manifest, path)
+        self.assertEqual(load_manifest(path), manifest)
+
+    def test_plan_build_skips_unchanged(self):
+        out = self.write("index.html", "<p>hi</p>")
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {"index.md": {"hash": "h1", "output": out, "output_signature": output_signature(out)}},
+        }
+        to_build, unchanged, stale = plan_build(manifest, {"index.md": ("h1", out)}, "t1", "/")
+        self.assertEqual(to_build, [])
+        self.assertEqual(unchanged, ["index.md"])
+        self.assertEqual(stale, [])
+
+    def test_plan_build_rebuilds_output_written_since(self):
+        out = self.write("index.html", "<p>hi</p>")
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {"index.md": {"hash": "h1", "output": out, "output_signature": output_signature(out)}},
+        }
+        # e.g. a plain build with another basepath rewrote it
+        self.write("index.html", '<a href="/blog/">hi</a>')
+        to_build, _, _ = plan_build(manifest, {"index.md": ("h1", out)}, "t1", "/")
+        self.assertEqual(to_build, ["index.md"])
+
+    def test_plan_build_rebuilds_changed_source(self):
+        out = self.write("index.html", "<p>hi</p>")
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {"index.md": {"hash": "h1", "output": out}},
+        }
+        to_build, _, _ = plan_build(manifest, {"index.md": ("h2", out)}, "t1", "/")
+        self.assertEqual(to_build, ["index.md"])
+
+    def test_plan_build_template_change_rebuilds_all(self):
+        a = self.write("a.html", "a")
+        b = self.write("b.html", "b")
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {
+                "a.md": {"hash": "ha", "output": a},
+                "b.md": {"hash": "hb", "output": b},
+            },
+        }
+        pages = {"a.md": ("ha", a), "b.md": ("hb", b)}
+        to_build, unchanged, _ = plan_build(manifest, pages, "t2", "/")
+        self.assertEqual(sorted(to_build), ["a.md", "b.md"])
+        self.assertEqual(unchanged, [])
+
+    def test_plan_build_parser_version_change_rebuilds_all(self):
+        a = self.write("a.html", "a")
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "parser_version": 3,
+            "pages": {"a.md": {"hash": "ha", "output": a, "output_signature": output_signature(a)}},
+        }
+        pages = {"a.md": ("ha", a)}
+        to_build, _, _ = plan_build(manifest, pages, "t1", "/", 4)
+        self.assertEqual(to_build, ["a.md"])
+        _, unchanged, _ = plan_build(manifest, pages, "t1", "/", 3)
+        self.assertEqual(unchanged, ["a.md"])
+
+    def test_plan_build_missing_output_rebuilds(self):
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {"a.md": {"hash": "ha", "output": self.path("gone.html")}},
+        }
+        pages = {"a.md": ("ha", self.path("gone.html"))}
+        to_build, _, _ = plan_build(manifest, pages, "t1", "/")
+        self.assertEqual(to_build, ["a.md"])
+
+    def test_plan_build_reports_stale_outputs(self):
+        manifest = {
+            "version": 1,
+            "basepath": "/",
+            "template": "t1",
+            "pages": {"old.md": {"hash": "h", "output": "docs/old.html"}},
+        }
+        _, _, stale = plan_build(manifest, {}, "t1", "/")
+        self.assertEqual(stale, ["docs/old.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
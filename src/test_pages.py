@@ -0,0 +1,85 @@
+import unittest, os, tempfile
+from unittest import mock
+
+from fixtures import TempDirTestCase
+from pages import discover_pages, write_page
+
+class TestWritePage(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = self.path("docs", "index.html")
+
+    def read(self):
+        with open(self.dest) as f:
+            return f.read()
+
+    def test_writes_new_page(self):
+        self.assertTrue(write_page("<p>hi</p>", self.dest))
+        self.assertEqual(self.read(), "<p>hi</p>")
+
+    def test_writes_chunks(self):
+        self.assertTrue(write_page(iter(["<p>", "hi", "</p>"]), self.dest))
+        self.assertEqual(self.read(), "<p>hi</p>")
+
+    def test_unchanged_page_is_not_touched(self):
+        write_page("<p>hi</p>", self.dest)
+        os.utime(self.dest, ns=(0, 0))
+        self.assertFalse(write_page(["<p>", "hi</p>"], self.dest))
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 0)
+
+    def test_unchanged_page_writes_no_temp_file(self):
+        write_page("<p>hi</p>", self.dest)
+        with mock.patch("tempfile.mkstemp", wraps=tempfile.mkstemp) as mkstemp:
+            self.assertFalse(write_page(iter(["<p>", "hi", "</p>"]), self.dest))
+            self.assertTrue(write_page("<p>ho</p>", self.dest))
+        self.assertEqual(mkstemp.call_count, 1)
+
+    def test_page_changed_late_or_shortened(self):
+        write_page("<p>hi</p><p>there</p>", self.dest)
+        self.assertTrue(write_page(iter(["<p>hi</p>", "<p>you</p>"]), self.dest))
+        self.assertEqual(self.read(), "<p>hi</p><p>you</p>")
+        self.assertTrue(write_page(iter(["<p>hi</p>", ""]), self.dest))
+        self.assertEqual(self.read(), "<p>hi</p>")
+        self.assertTrue(write_page("<p>hi</p>!", self.dest))
+        self.assertEqual(self.read(), "<p>hi</p>!")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_changed_page_is_replaced(self):
+        write_page("<p>hi</p>", self.dest)
+        self.assertTrue(write_page("<p>ho</p>", self.dest))
+        self.assertEqual(self.read(), "<p>ho</p>")
+
+    def test_failed_render_keeps_old_page(self):
+        write_page("<p>hi</p>", self.dest)
+
+        def chunks():
+            yield "<p>half"
+            raise ValueError("render failed")
+
+        with self.assertRaises(ValueError):
+            write_page(chunks(), self.dest)
+        self.assertEqual(self.read(), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_new_page_gets_default_permissions(self):
+        write_page("<p>hi</p>", self.dest)
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(os.stat(self.dest).st_mode & 0o777, 0o666 & ~umask)
+
+
+class TestDiscoverPages(unittest.TestCase):
+    def test_discover_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "blog", "post"))
+            for path in ("index.md", os.path.join("blog", "post", "index.md")):
+                with open(os.path.join(tmp, path), "w") as f:
+                    f.write("# Hi")
+            self.assertEqual(discover_pages(tmp, "docs"), [
+                (os.path.join(tmp, "blog", "post", "index.md"), os.path.join("docs", "blog", "post", "index.html")),
+                (os.path.join(tmp, "index.md"), os.path.join("docs", "index.html")),
+            ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest, io, os, tempfile
+from contextlib import redirect_stdout
+
+from parallel import resolve_jobs, run_parallel
+from main import generate_page, generate_pages, discover_pages
+
+def square_and_log(n):
+    print(f"item {n}")
+    return n * n
+
+class TestParallel(unittest.TestCase):
+    def test_resolve_jobs(self):
+        self.assertEqual(resolve_jobs(3), 3)
+        self.assertEqual(resolve_jobs(0), os.cpu_count() or 1)
+        with self.assertRaises(ValueError):
+            resolve_jobs(-1)
+
+    def test_results_and_logs_keep_input_order(self):
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            results, worker_stats = run_parallel(square_and_log, [(n,) for n in range(20)], 4)
+        self.assertEqual(results, [n * n for n in range(20)])
+        self.assertEqual(buffer.getvalue(), "".join(f"item {n}\n" for n in range(20)))
+        self.assertEqual(sum(stats["items"] for stats in worker_stats.values()), 20)
+
+    def test_parallel_build_matches_serial_build(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            for i in range(6):
+                path = os.path.join(content, "blog" if i % 2 else "", f"page{i}.md")
+                with open(path, "w") as f:
+                    f.write(f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).\n")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write('<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+
+            serial = discover_pages(content, os.path.join(tmp, "serial"))
+            parallel = discover_pages(content, os.path.join(tmp, "parallel"))
+            for src_path, dest_path in serial:
+                generate_page("site", src_path, template, dest_path)
+            generate_pages("site", parallel, template, jobs=3)
+
+            for (_, serial_path), (_, parallel_path) in zip(serial, parallel):
+                with open(serial_path, "rb") as a, open(parallel_path, "rb") as b:
+                    self.assertEqual(a.read(), b.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
-import unittest
+import unittest, io, sys
 
+from htmlnode import HTMLNode, render_chunks
 from parentnode import ParentNode
 from leafnode import LeafNode
+from textnode import TextNode, TextType
 
 class TestParentNode(unittest.TestCase):
     def test_eq(self):
@@ -24,6 +26,48 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        parent_node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Some "), LeafNode("b", "bold")]),
+            LeafNode("a", "link", {"href": "/"}),
+        ])
+        chunks = list(parent_node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), parent_node.to_html())
+
+    def test_write_html(self):
+        parent_node = ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])])
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(fp.getvalue(), "<ul><li>item</li></ul>")
+
+    def test_text_node_children(self):
+        parent_node = ParentNode("p", [
+            TextNode("a ", TextType.TEXT),
+            ParentNode("b", [TextNode("bold ", TextType.TEXT), TextNode("link", TextType.LINK, "/x")]),
+        ])
+        self.assertEqual(parent_node.to_html(), '<p>a <b>bold <a href="/x">link</a></b></p>')
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit() * 10
+        node = LeafNode("b", "x")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        expected = "<span>" * depth + "<b>x</b>" + "</span>" * depth
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual("".join(node.iter_html()), expected)
+
+    def test_render_chunks_custom_node(self):
+        class Comment(HTMLNode):
+            __slots__ = ()
+
+            def to_html(self):
+                return f"<!--{self.value}-->"
+
+        parent_node = ParentNode("div", [Comment(value="note"), LeafNode("i", "x")])
+        self.assertEqual(parent_node.to_html(), "<div><!--note--><i>x</i></div>")
+        self.assertEqual(render_chunks(parent_node), ["<div>", "<!--note-->", "<i>x</i>", "</div>"])
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
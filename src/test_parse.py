@@ -1,4 +1,4 @@
-import unittest, textwrap
+import unittest, textwrap, random, os, tempfile
 
 from textnode import TextNode, TextType
 from parse import (
@@ -10,8 +10,18 @@ from parse import (
     text_to_textnodes, 
     markdown_to_blocks,
     markdown_to_html_node,
-    extract_title
+    extract_title,
+    iter_markdown_html,
+    convert_md_header_to_html,
+    convert_md_blockquote_to_html,
+    convert_md_unordered_list_to_html,
+    convert_md_ordered_list_to_html,
+    convert_md_code_block_to_html,
+    convert_md_paragraph_to_html,
 )
+from blocks import BlockType, block_to_block_type
+from parentnode import ParentNode
+from main import generate_page
 
 class TestParse(unittest.TestCase):
     def test_code_parse(self):
@@ -377,6 +387,42 @@ class TestParse(unittest.TestCase):
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff</code></pre></div>",
         )
     
+    def test_codeblock_with_blank_lines(self):
+        md = "```\nfirst()\n\nsecond()\n```\n\nAfter"
+
+        node = markdown_to_html_node(md)
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>first()\n\nsecond()</code></pre><p>After</p></div>",
+        )
+
+    def test_matches_block_string_pipeline(self):
+        # Without code fences, the line scanner must build exactly what
+        # markdown_to_blocks + block_to_block_type + convert_md_* did.
+        converters = {
+            BlockType.HEADING.value: convert_md_header_to_html,
+            BlockType.QUOTE.value: convert_md_blockquote_to_html,
+            BlockType.UNORDERED_LIST.value: convert_md_unordered_list_to_html,
+            BlockType.ORDERED_LIST.value: convert_md_ordered_list_to_html,
+            BlockType.CODE.value: convert_md_code_block_to_html,
+            BlockType.PARAGRAPH.value: convert_md_paragraph_to_html,
+        }
+        def block_string_pipeline(md):
+            blocks = markdown_to_blocks(md)
+            children = [converters[block_to_block_type(block)](block) for block in blocks]
+            return ParentNode("div", children, None).to_html()
+
+        rng = random.Random(0)
+        lines = [
+            "", "", "   ", "# Title", "## Sub title", "####### seven", "> quote", ">", "> more **quote**",
+            "- item", "* item _it_", "+ item", "1. one", "2. two", "3. three", "5. five",
+            "plain text", "  indented text  ", "a [link](/x) and ![img](/y.png)",
+        ]
+        for _ in range(2000):
+            md = "\n".join(rng.choice(lines) for _ in range(rng.randint(0, 15)))
+            self.assertEqual(markdown_to_html_node(md).to_html(), block_string_pipeline(md), repr(md))
+
     def test_header_and_paragraphs(self):
         md = """
         # A heading!
@@ -414,5 +460,32 @@ class TestParse(unittest.TestCase):
         target = "A heading!"
         self.assertEqual(title, target)
 
+class TestStreaming(unittest.TestCase):
+    MD = "# Big page\n\nIntro with a [link](/x).\n\n```\ncode\n\nmore code\n```\n\n- a\n- b\n\n> quote\n"
+
+    def test_iter_markdown_html_matches_to_html(self):
+        chunks = list(iter_markdown_html(self.MD.split("\n")))
+        self.assertEqual("".join(chunks), markdown_to_html_node(self.MD).to_html())
+        self.assertEqual(len(chunks), 7) # div open, five blocks, div close
+
+    def test_streamed_page_matches_loaded_page(self):
+        with tempfile.TemporaryDirectory() as root:
+            source = os.path.join(root, "index.md")
+            template = os.path.join(root, "template.html")
+            with open(source, "w") as f:
+                f.write(self.MD)
+            with open(template, "w") as f:
+                f.write('<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+
+            outputs = []
+            for threshold in (None, 0):
+                dest = os.path.join(root, f"out-{threshold}.html")
+                generate_page("py-ssg", source, template, dest, stream_threshold=threshold)
+                with open(dest) as f:
+                    outputs.append(f.read())
+            self.assertEqual(outputs[0], outputs[1])
+            self.assertIn("<title>Big page</title>", outputs[1])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import unittest, json, os, tempfile
+
+from parse import markdown_to_html_node
+from profiling import PageProfile, BuildProfile, PHASES
+
+class TestProfiling(unittest.TestCase):
+    def test_markdown_to_html_node_records_parse_phases(self):
+        profile = PageProfile("index.md")
+        markdown_to_html_node("# Title\n\nSome **bold** text.\n\n- a\n- b", profile)
+        self.assertEqual(
+            sorted(profile.timings), ["inline", "scan_blocks"]
+        )
+        self.assertTrue(all(seconds >= 0 for seconds in profile.timings.values()))
+
+    def test_build_profile_totals_and_ordering(self):
+        build = BuildProfile()
+        build.add("discovery", 0.5)
+        fast = PageProfile("fast.md")
+        fast.add("read", 0.1)
+        slow = PageProfile("slow.md")
+        slow.add("read", 0.2)
+        slow.add("write", 0.3)
+        build.add_page(fast)
+        build.add_page(slow)
+
+        self.assertAlmostEqual(build.timings["read"], 0.3)
+        self.assertEqual([page.path for page in build.slowest_pages()], ["slow.md", "fast.md"])
+        report = build.report(limit=1)
+        self.assertIn("Slowest pages (1 of 2)", report)
+        self.assertIn("slow.md", report)
+        self.assertNotIn("fast.md", report)
+
+    def test_save_json(self):
+        build = BuildProfile()
+        page = PageProfile("index.md")
+        page.add("inline", 0.25)
+        build.add_page(page)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.json")
+            build.save(path)
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(sorted(data["phases"]), sorted(PHASES))
+        self.assertEqual(data["pages"]["index.md"]["total"], 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
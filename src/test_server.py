@@ -0,0 +1,399 @@
+import unittest, email.utils, functools, gzip, http.client, os, socket, sys, threading, time
+from http.server import HTTPServer
+
+from fixtures import TempDirTestCase
+
+# server.py lives at the repository root, next to src/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server import (
+    CORSHTTPRequestHandler,
+    DEFAULT_CACHE_FILE_BYTES,
+    DevHTTPRequestHandler,
+    FileCache,
+    PooledHTTPServer,
+    RenderedPages,
+    accepts_gzip,
+    parse_range,
+)
+
+class QuietHandler(CORSHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class QuietDevHandler(DevHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+class ServerTestCase(TempDirTestCase):
+    workers = 4
+    max_connections = 8
+    cache_file_bytes = DEFAULT_CACHE_FILE_BYTES
+    use_sendfile = True
+
+    def setUp(self):
+        super().setUp()
+        self.write("index.html", "<h1>Hello</h1>")
+        self.cache = FileCache(max_file_bytes=self.cache_file_bytes)
+        handler_class = type(
+            "Handler", (QuietHandler,), {"file_cache": self.cache, "use_sendfile": self.use_sendfile}
+        )
+        handler = functools.partial(handler_class, directory=self.tmp.name)
+        self.serve(self.make_server(handler))
+
+    def serve(self, server):
+        self.server = server
+        self.port = server.server_address[1]
+        self.thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def make_server(self, handler):
+        return PooledHTTPServer(("127.0.0.1", 0), handler, self.workers, self.max_connections)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def connect(self):
+        return http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+
+    def get(self, path, headers=None, method="GET"):
+        conn = self.connect()
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    def stalled_client(self):
+        # Connected, but never sends a request
+        sock = socket.create_connection(("127.0.0.1", self.port))
+        self.addCleanup(sock.close)
+        return sock
+
+class TestPooledHTTPServer(ServerTestCase):
+    def test_keep_alive_and_cors(self):
+        conn = self.connect()
+        conn.request("GET", "/index.html")
+        response = conn.getresponse()
+        self.assertEqual(response.read(), b"<h1>Hello</h1>")
+        self.assertEqual(response.getheader("Access-Control-Allow-Origin"), "*")
+        sock = conn.sock
+
+        conn.request("OPTIONS", "/index.html")
+        response = conn.getresponse()
+        self.assertEqual((response.status, response.read()), (200, b""))
+        self.assertEqual(response.getheader("Access-Control-Allow-Methods"), "GET, OPTIONS")
+        self.assertIs(conn.sock, sock)
+        conn.close()
+
+    def test_stalled_client_does_not_block_others(self):
+        self.stalled_client()
+        conn = self.connect()
+        conn.request("GET", "/index.html")
+        self.assertEqual(conn.getresponse().status, 200)
+        conn.close()
+
+class TestSingleThreadedServer(ServerTestCase):
+    def make_server(self, handler):
+        return HTTPServer(("127.0.0.1", 0), handler)
+
+    def test_plain_server_does_not_keep_connections_open(self):
+        # One idle keep-alive client would block a single-threaded server
+        response, body = self.get("/index.html")
+        self.assertEqual((response.status, body), (200, b"<h1>Hello</h1>"))
+        self.assertEqual(response.version, 10)
+        self.assertTrue(response.will_close)
+
+class TestFileCache(TempDirTestCase):
+    def test_hit_after_miss(self):
+        path = self.write("a.html", b"<p>a</p>")
+        cache = FileCache()
+        first = cache.get(path)
+        self.assertIs(cache.get(path), first)
+        self.assertEqual(first.body, b"<p>a</p>")
+        self.assertEqual((cache.hits, cache.misses, cache.hit_rate()), (1, 1, 0.5))
+
+    def test_changed_file_is_reread(self):
+        path = self.write("a.html", b"old", mtime_ns=10**18)
+        cache = FileCache()
+        old = cache.get(path)
+        self.write("a.html", b"new", mtime_ns=10**18 + 1)
+        new = cache.get(path)
+        self.assertEqual(new.body, b"new")
+        self.assertNotEqual(new.etag, old.etag)
+        self.assertEqual(cache.total_bytes, 3)
+
+    def test_least_recently_used_is_evicted(self):
+        paths = [self.write(name, b"x" * 10) for name in "abc"]
+        cache = FileCache(max_bytes=20)
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+        self.assertEqual(list(cache.entries), [paths[0], paths[2]])
+        self.assertEqual((cache.total_bytes, cache.evictions), (20, 1))
+
+    def test_large_files_are_not_cached(self):
+        path = self.write("big.png", b"x" * 100)
+        cache = FileCache(max_file_bytes=50)
+        entry = cache.get(path)
+        self.assertIsNone(entry.body)
+        self.assertEqual(entry.size, 100)
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_deleted_file(self):
+        path = self.write("a.html", b"a")
+        cache = FileCache()
+        cache.get(path)
+        os.remove(path)
+        with self.assertRaises(OSError):
+            cache.get(path)
+        self.assertEqual((len(cache.entries), cache.total_bytes), (0, 0))
+
+class TestConditionalRequests(ServerTestCase):
+    def test_etag_and_if_none_match(self):
+        response, body = self.get("/")
+        etag = response.getheader("ETag")
+        self.assertEqual(body, b"<h1>Hello</h1>")
+        self.assertTrue(etag.startswith('"'))
+        self.assertIsNotNone(response.getheader("Last-Modified"))
+
+        response, body = self.get("/index.html", {"If-None-Match": f'"other", {etag}'})
+        self.assertEqual((response.status, body), (304, b""))
+        self.assertEqual(response.getheader("ETag"), etag)
+        self.assertEqual(response.getheader("Access-Control-Allow-Origin"), "*")
+        self.assertEqual(self.get("/", {"If-None-Match": '"other"'})[0].status, 200)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_if_modified_since(self):
+        last_modified = self.get("/index.html")[0].getheader("Last-Modified")
+        self.assertEqual(self.get("/index.html", {"If-Modified-Since": last_modified})[0].status, 304)
+        earlier = email.utils.formatdate(time.time() - 3600, usegmt=True)
+        self.assertEqual(self.get("/index.html", {"If-Modified-Since": earlier})[0].status, 200)
+
+    def test_edited_file_is_served_fresh(self):
+        etag = self.get("/index.html")[0].getheader("ETag")
+        self.write("index.html", "<h1>Edited</h1>", mtime_ns=10**18)
+        response, body = self.get("/index.html", {"If-None-Match": etag})
+        self.assertEqual((response.status, body), (200, b"<h1>Edited</h1>"))
+
+    def test_missing_file(self):
+        self.assertEqual(self.get("/missing.html")[0].status, 404)
+
+class TestGzipSidecars(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self.path("index.html")
+        self.write("index.html.gz", gzip.compress(b"<h1>Hello</h1>"))
+        self.match_mtime()
+
+    def match_mtime(self, mtime_ns=10**18):
+        os.utime(self.page, ns=(mtime_ns, mtime_ns))
+        os.utime(self.page + ".gz", ns=(mtime_ns, mtime_ns))
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate, br"))
+        self.assertTrue(accepts_gzip("br;q=1.0, GZIP;q=0.5"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip(""))
+        self.assertFalse(accepts_gzip("br, deflate"))
+        self.assertFalse(accepts_gzip("gzip;q=0, *"))
+        self.assertFalse(accepts_gzip("identity, *;q=0"))
+
+    def test_sidecar_sent_to_gzip_clients(self):
+        response, body = self.get("/", {"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Content-Type"), "text/html")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), b"<h1>Hello</h1>")
+        gzip_etag = response.getheader("ETag")
+
+        response, body = self.get("/")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(body, b"<h1>Hello</h1>")
+        self.assertNotEqual(response.getheader("ETag"), gzip_etag)
+
+        response, _ = self.get("/", {"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+
+    def test_stale_sidecar_is_ignored(self):
+        os.utime(self.page, ns=(2 * 10**18, 2 * 10**18))
+        response, body = self.get("/index.html", {"Accept-Encoding": "gzip"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertIsNone(response.getheader("Vary"))
+        self.assertEqual(body, b"<h1>Hello</h1>")
+
+class TestParseRange(unittest.TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range("bytes=0-9", 100), [(0, 10)])
+        self.assertEqual(parse_range("bytes=90-", 100), [(90, 100)])
+        self.assertEqual(parse_range("bytes=-10", 100), [(90, 100)])
+        self.assertEqual(parse_range("bytes=-500", 100), [(0, 100)])
+        self.assertEqual(parse_range("bytes=95-200", 100), [(95, 100)])
+        self.assertEqual(parse_range("bytes=0-0, 50-59 ,-1", 100), [(0, 1), (50, 60), (99, 100)])
+
+    def test_unsatisfiable(self):
+        self.assertEqual(parse_range("bytes=100-", 100), [])
+        self.assertEqual(parse_range("bytes=200-300, -0", 100), [])
+
+    def test_ignored(self):
+        for header in ("items=0-1", "bytes=", "bytes=-", "bytes=5-1", "bytes=a-b", "bytes=1-2-3", "bytes=١-2"):
+            self.assertIsNone(parse_range(header, 100), header)
+        self.assertIsNone(parse_range("bytes=" + ",".join(["0-1"] * 17), 100))
+
+class TestRangeRequests(ServerTestCase):
+    data = bytes(range(256)) * 40
+
+    def setUp(self):
+        super().setUp()
+        self.write("data.bin", self.data)
+
+    def test_full_response_advertises_ranges(self):
+        response, body = self.get("/data.bin")
+        self.assertEqual((response.status, body), (200, self.data))
+        self.assertEqual(response.getheader("Accept-Ranges"), "bytes")
+
+    def test_single_range(self):
+        response, body = self.get("/data.bin", {"Range": "bytes=100-299"})
+        self.assertEqual((response.status, body), (206, self.data[100:300]))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 100-299/{len(self.data)}")
+        self.assertEqual(response.getheader("Content-Type"), "application/octet-stream")
+        self.assertEqual(self.get("/data.bin", {"Range": "bytes=-10"})[1], self.data[-10:])
+
+    def test_multiple_ranges(self):
+        response, body = self.get("/data.bin", {"Range": "bytes=0-9,5000-5009"})
+        self.assertEqual(response.status, 206)
+        content_type = response.getheader("Content-Type")
+        self.assertTrue(content_type.startswith("multipart/byteranges; boundary="))
+        boundary = content_type.split("boundary=")[1].encode()
+        self.assertEqual(int(response.getheader("Content-Length")), len(body))
+
+        parts = body.split(b"--" + boundary)
+        self.assertEqual(parts[-1], b"--\r\n")
+        expected = [(0, 10), (5000, 5010)]
+        for part, (start, stop) in zip(parts[1:-1], expected):
+            headers, _, content = part.partition(b"\r\n\r\n")
+            self.assertIn(f"Content-Range: bytes {start}-{stop - 1}/{len(self.data)}".encode(), headers)
+            self.assertEqual(content, self.data[start:stop] + b"\r\n")
+
+    def test_unsatisfiable_range(self):
+        response, body = self.get("/data.bin", {"Range": f"bytes={len(self.data)}-"})
+        self.assertEqual((response.status, body), (416, b""))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes */{len(self.data)}")
+
+    def test_if_range(self):
+        etag = self.get("/data.bin")[0].getheader("ETag")
+        response, body = self.get("/data.bin", {"Range": "bytes=0-9", "If-Range": etag})
+        self.assertEqual((response.status, body), (206, self.data[:10]))
+        response, body = self.get("/data.bin", {"Range": "bytes=0-9", "If-Range": '"old"'})
+        self.assertEqual((response.status, body), (200, self.data))
+
+    def test_head(self):
+        response, body = self.get("/data.bin", {"Range": "bytes=0-9"}, method="HEAD")
+        self.assertEqual((response.status, body), (206, b""))
+        self.assertEqual(response.getheader("Content-Length"), "10")
+
+class TestSendfile(TestRangeRequests):
+    # Too big for the cache, so files are sent from disk with sendfile
+    cache_file_bytes = 1024
+
+class TestCopyWithoutSendfile(TestSendfile):
+    use_sendfile = False
+
+class TestConnectionLimit(ServerTestCase):
+    workers = 1
+    max_connections = 1
+
+    def test_connections_over_the_limit_get_503(self):
+        self.stalled_client()
+        conn = self.connect()
+        conn.request("GET", "/index.html")
+        response = conn.getresponse()
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.getheader("Access-Control-Allow-Origin"), "*")
+        self.assertEqual(self.server.rejected, 1)
+        conn.close()
+
+class TestQueuedConnectionsOnClose(ServerTestCase):
+    workers = 1
+    max_connections = 4
+
+    def test_queued_connections_are_closed(self):
+        self.stalled_client() # holds the only worker
+        queued = self.stalled_client()
+        time.sleep(0.2) # let the server accept it into the queue
+        self.server.shutdown()
+        self.server.server_close()
+        queued.settimeout(2)
+        self.assertEqual(queued.recv(1), b"")
+        self.assertEqual(self.server.connection_slots._value, self.max_connections - 1)
+
+class TestDevServer(ServerTestCase):
+    def setUp(self):
+        # A site of its own instead of ServerTestCase's index.html
+        TempDirTestCase.setUp(self)
+        self.write("template.html", "<title>{{ Title }}</title><a href=\"/index.css\"></a>{{ Content }}")
+        self.write("content/index.md", "# Home\n\nWelcome")
+        self.write("content/blog/tom/index.md", "# Tom\n\nA _post_")
+        self.write("content/about.md", "# About")
+        self.write("static/index.css", "body {}")
+        self.pages = RenderedPages(self.path("template.html"), "site")
+        handler_class = type(
+            "DevHandler",
+            (QuietDevHandler,),
+            {"content_dir": self.path("content"), "rendered_pages": self.pages, "file_cache": FileCache()},
+        )
+        handler = functools.partial(handler_class, directory=self.path("static"))
+        self.serve(self.make_server(handler))
+
+    def test_renders_pages_on_request(self):
+        response, body = self.get("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Type"), "text/html")
+        self.assertEqual(body, b'<title>Home</title><a href="/site/index.css"></a><div><h1>Home</h1><p>Welcome</p></div>')
+        for path in ("/blog/tom/", "/blog/tom/index.html", "/site/blog/tom/"):
+            response, body = self.get(path)
+            self.assertIn(b"<p>A <i>post</i></p>", body, path)
+        response, body = self.get("/about.html")
+        self.assertIn(b"<h1>About</h1>", body)
+        self.assertEqual((self.pages.renders, self.pages.hits), (3, 2))
+
+    def test_directory_without_slash_redirects(self):
+        response, _ = self.get("/blog/tom")
+        self.assertEqual(response.status, 301)
+        self.assertEqual(response.getheader("Location"), "/blog/tom/")
+
+    def test_edits_show_up_on_the_next_request(self):
+        response, body = self.get("/about.html")
+        etag = response.getheader("ETag")
+        response, _ = self.get("/about.html", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+
+        self.write("content/about.md", "# About us", mtime_ns=10**18)
+        response, body = self.get("/about.html", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertIn(b"<h1>About us</h1>", body)
+        self.assertNotEqual(response.getheader("ETag"), etag)
+
+        self.write("template.html", "<main>{{ Content }}</main>", mtime_ns=10**18)
+        _, body = self.get("/about.html")
+        self.assertEqual(body, b"<main><div><h1>About us</h1></div></main>")
+
+    def test_static_files_and_missing_pages(self):
+        response, body = self.get("/site/index.css")
+        self.assertEqual((response.status, body), (200, b"body {}"))
+        response, _ = self.get("/missing.html")
+        self.assertEqual(response.status, 404)
+        response, _ = self.get("/../template.html")
+        self.assertEqual(response.status, 404)
+
+    def test_render_errors_are_500(self):
+        self.write("content/broken.md", "No title here")
+        response, _ = self.get("/broken.html")
+        self.assertEqual(response.status, 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest, os
+
+from fixtures import TempDirTestCase
+from sync import sync_tree, copy_file, prune_tree, remove_empty_dirs
+
+class TestSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = self.path("static")
+        self.dest = self.path("docs")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/tom.png", "PNG" * 100)
+
+    def sync(self, previous=(), **kwargs):
+        return sync_tree(self.src, self.dest, previous, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        synced, stats = self.sync()
+        self.assertEqual(synced, ["images/tom.png", "index.css"])
+        self.assertEqual(stats["copied"], 2)
+        self.assertEqual(stats["copied_bytes"], 307)
+        with open(os.path.join(self.dest, "images/tom.png")) as f:
+            self.assertEqual(f.read(), "PNG" * 100)
+
+    def test_second_sync_skips_unchanged(self):
+        synced, _ = self.sync()
+        _, stats = self.sync(synced)
+        self.assertEqual(stats["copied"], 0)
+        self.assertEqual(stats["skipped"], 2)
+        self.assertEqual(stats["skipped_bytes"], 307)
+
+    def test_changed_file_is_copied(self):
+        synced, _ = self.sync()
+        path = self.write("static/index.css", "body { color: red }")
+        _, stats = self.sync(synced)
+        self.assertEqual(stats["copied"], 1)
+        with open(os.path.join(self.dest, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_checksum_detects_same_size_edit(self):
+        synced, _ = self.sync()
+        dest_path = os.path.join(self.dest, "index.css")
+        src_stat = os.stat(os.path.join(self.src, "index.css"))
+        self.write("docs/index.css", "BODY {}")
+        os.utime(dest_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+        _, stats = self.sync(synced)
+        self.assertEqual(stats["copied"], 0)
+        _, stats = self.sync(synced, checksum=True)
+        self.assertEqual(stats["copied"], 1)
+
+    def test_stale_files_removed_but_pages_kept(self):
+        synced, _ = self.sync()
+        self.write("docs/index.html", "<p>generated</p>")
+        os.remove(os.path.join(self.src, "images/tom.png"))
+        _, stats = self.sync(synced)
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.html")))
+
+    def test_hardlink(self):
+        _, stats = self.sync(hardlink=True)
+        self.assertEqual(stats["linked"], 2)
+        self.assertTrue(os.path.samefile(
+            os.path.join(self.src, "index.css"), os.path.join(self.dest, "index.css")
+        ))
+
+    def test_copy_over_hardlink_leaves_source_alone(self):
+        src_path = os.path.join(self.src, "index.css")
+        dest_path = os.path.join(self.dest, "index.css")
+        os.makedirs(self.dest)
+        os.link(src_path, dest_path)
+        other = self.write("other.css", "p {}")
+        copy_file(other, dest_path, 4)
+        with open(src_path) as f:
+            self.assertEqual(f.read(), "body {}")
+
+    def test_remove_empty_dirs_stops_at_root(self):
+        nested = os.path.join(self.dest, "a", "b")
+        os.makedirs(nested)
+        remove_empty_dirs(nested, self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "a")))
+        self.assertTrue(os.path.exists(self.dest))
+
+    def test_prune_tree_keeps_listed_files(self):
+        synced, _ = self.sync()
+        page = self.write("docs/blog/index.html", "<p>generated</p>")
+        self.write("docs/old/gone.html", "<p>stale</p>")
+        mtime_ns = os.stat(page).st_mtime_ns
+        removed = prune_tree(self.dest, set(synced) | {"blog/index.html"})
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "old")))
+        self.assertEqual(os.stat(page).st_mtime_ns, mtime_ns)
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images/tom.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
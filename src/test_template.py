@@ -0,0 +1,77 @@
+import unittest, os, tempfile
+
+from template import Template, load_template, rewrite_basepath, rewrite_basepath_stream
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/index.css" /><article>{{ Content }}</article>'
+
+def replace_render(source, basepath, title, content):
+    # The str.replace pipeline generate_page used before templates were compiled
+    html = source.replace("{{ Title }}", title)
+    html = html.replace("{{ Content }}", content)
+    if basepath != "/":
+        html = html.replace('href="/', f'href="/{basepath}/')
+        html = html.replace('src="/', f'src="/{basepath}/')
+    return html
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template(TEMPLATE)
+        html = template.render(Title="Hi", Content="<p>Body</p>")
+        self.assertEqual(
+            html,
+            '<title>Hi</title><link href="/index.css" /><article><p>Body</p></article>',
+        )
+
+    def test_basepath_applied_to_static_parts(self):
+        template = Template(TEMPLATE, "py-ssg")
+        self.assertIn('href="/py-ssg/index.css"', template.parts[2])
+
+    def test_matches_replace_pipeline(self):
+        content = '<p><a href="/">Home</a><img src="/images/tom.png" alt="tom"></img></p>'
+        for basepath in ("/", "py-ssg"):
+            template = Template(TEMPLATE, basepath)
+            self.assertEqual(
+                template.render(Title="Tom", Content=content),
+                replace_render(TEMPLATE, basepath, "Tom", content),
+            )
+
+    def test_iter_render_streams_chunks(self):
+        template = Template(TEMPLATE, "py-ssg")
+        chunks = ['<p><a hr', 'ef="/">Home</a>', '<img src', '="/tom.png" /></p>']
+        self.assertEqual(
+            "".join(template.iter_render(Title="Tom", Content=iter(chunks))),
+            template.render(Title="Tom", Content="".join(chunks)),
+        )
+
+    def test_rewrite_basepath_stream_split_patterns(self):
+        text = 'a href="/x" src="/y" href="/z"'
+        for size in range(1, len(text) + 1):
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            self.assertEqual(
+                "".join(rewrite_basepath_stream(chunks, "bp")),
+                rewrite_basepath(text, "bp"),
+            )
+
+    def test_repeated_and_missing_slots(self):
+        template = Template("{{ Title }} - {{ Title }} {{ Footer }}")
+        self.assertEqual(template.render(Title="A"), "A - A {{ Footer }}")
+
+    def test_rewrite_basepath_root_is_noop(self):
+        self.assertEqual(rewrite_basepath('href="/x"', "/"), 'href="/x"')
+
+    def test_load_template_is_cached_until_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write(TEMPLATE)
+            first = load_template(path)
+            self.assertIs(first, load_template(path))
+
+            with open(path, "w") as f:
+                f.write("<main>{{ Content }}</main>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_template(path).render(Content="x"), "<main>x</main>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,18 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from leafnode import LeafNode
+from parentnode import ParentNode
+from parse import markdown_to_html_node
+from textnode import (
+    TextNode,
+    TextType,
+    BOLD,
+    TEXT_RENDERERS,
+    lower_text_nodes,
+    register_text_renderer,
+    span_html_node,
+    text_node_to_html_node,
+)
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -64,5 +76,74 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.tag, "img")
         self.assertEqual(html_node.to_html(), "<img src=\"https://www.google.com\" alt=\"Here's an image\"></img>")
 
+    def test_type_code_constructor(self):
+        node = TextNode("bold", BOLD)
+        self.assertEqual(node, TextNode("bold", TextType.BOLD))
+        self.assertIs(node.text_type, TextType.BOLD.value)
+        self.assertEqual(repr(node), "TextNode(bold, bold, None)")
+
+    def test_slots(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+
+    def test_unsupported_type(self):
+        with self.assertRaises(Exception):
+            text_node_to_html_node(TextNode("x", "marquee"))
+
+class TestLowerTextNodes(unittest.TestCase):
+    def setUp(self):
+        self.renderers = dict(TEXT_RENDERERS)
+
+    def tearDown(self):
+        TEXT_RENDERERS.clear()
+        TEXT_RENDERERS.update(self.renderers)
+
+    def test_lowers_nested_nodes(self):
+        inner = ParentNode("b", [TextNode("bold", TextType.TEXT)])
+        nodes = [TextNode("a ", TextType.TEXT), inner, TextNode("c", TextType.CODE)]
+        lowered = lower_text_nodes(nodes)
+        self.assertEqual(lowered, [LeafNode(None, "a "), inner, LeafNode("code", "c")])
+        self.assertEqual(inner.children, [LeafNode(None, "bold")])
+        self.assertIsInstance(nodes[0], TextNode)
+
+    def test_parsed_tree_has_no_text_nodes(self):
+        node = markdown_to_html_node("Some **bold _nested_** text\n\n- [a](/b)")
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            self.assertNotIsInstance(current, TextNode)
+            pending.extend(current.children or ())
+
+    def test_register_text_renderer(self):
+        register_text_renderer(
+            TextType.LINK,
+            lambda node: LeafNode("a", node.text, {"href": node.url, "rel": "nofollow"}),
+        )
+        register_text_renderer("mark", lambda node: LeafNode("mark", node.text))
+        lowered = lower_text_nodes([TextNode("x", TextType.LINK, "/u"), TextNode("y", "mark")])
+        self.assertEqual(
+            ParentNode("p", lowered).to_html(),
+            '<p><a href="/u" rel="nofollow">x</a><mark>y</mark></p>',
+        )
+
+    def test_renderer_wrapping_its_text_node(self):
+        register_text_renderer(TextType.BOLD, lambda node: ParentNode("strong", [TextNode(node.text, TextType.TEXT)]))
+        lowered = lower_text_nodes([TextNode("x", TextType.BOLD)])
+        self.assertEqual(ParentNode("p", lowered).to_html(), "<p><strong>x</strong></p>")
+
+    def test_renderers_apply_to_nested_spans(self):
+        register_text_renderer(
+            TextType.LINK,
+            lambda node: span_html_node("a", node, {"href": node.url, "rel": "nofollow"}),
+        )
+        register_text_renderer(TextType.BOLD, lambda node: span_html_node("strong", node))
+        self.assertEqual(
+            markdown_to_html_node("[**bold**](/b) and **x _y_** and [a _b_](/c)").to_html(),
+            '<div><p><a href="/b" rel="nofollow"><strong>bold</strong></a> and '
+            '<strong>x <i>y</i></strong> and <a href="/c" rel="nofollow">a <i>b</i></a></p></div>',
+        )
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
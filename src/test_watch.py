@@ -0,0 +1,100 @@
+import unittest, os
+
+from fixtures import TempDirTestCase
+from watch import SiteWatcher
+
+class TestSiteWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = self.path("content")
+        self.static = self.path("static")
+        self.template = self.path("template.html")
+        self.docs = self.path("docs")
+
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome.")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nSome **bold** text.")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+
+        self.watcher = SiteWatcher("/", self.content, self.static, self.template, self.docs)
+        self.watcher.start()
+
+    def read(self, *parts):
+        with open(os.path.join(self.docs, *parts)) as f:
+            return f.read()
+
+    def test_start_renders_every_page(self):
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1><p>Welcome.</p></div>")
+        self.assertIn("<b>bold</b>", self.read("blog", "post.html"))
+
+    def test_poll_without_changes_does_nothing(self):
+        self.assertEqual(self.watcher.poll(), ([], [], []))
+
+    def test_only_changed_page_is_rebuilt(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nChanged.", 1)
+        rendered, copied, removed = self.watcher.poll()
+        self.assertEqual(rendered, [os.path.join(self.docs, "index.html")])
+        self.assertEqual((copied, removed), ([], []))
+        self.assertIn("Changed.", self.read("index.html"))
+
+    def test_template_change_rerenders_without_parsing(self):
+        # Corrupt the markdown without touching its stat signature: a
+        # template change must reuse the parsed body, not re-read the file.
+        index = os.path.join(self.content, "index.md")
+        stat = os.stat(index)
+        self.write(index, "# Nope\n\nGarbage", stat.st_mtime_ns)
+        self.watcher.state[index] = (stat.st_mtime_ns, len("# Nope\n\nGarbage"))
+
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", 1)
+        rendered, _, _ = self.watcher.poll()
+        self.assertEqual(len(rendered), 2)
+        self.assertEqual(self.read("index.html"), "<h1>Home</h1><div><h1>Home</h1><p>Welcome.</p></div>")
+
+    def test_new_and_deleted_pages(self):
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nMe.")
+        rendered, _, _ = self.watcher.poll()
+        self.assertEqual(rendered, [os.path.join(self.docs, "about.html")])
+
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        _, _, removed = self.watcher.poll()
+        self.assertEqual(removed, [os.path.join(self.docs, "blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+
+    def test_static_change_is_copied(self):
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }", 1)
+        _, copied, _ = self.watcher.poll()
+        self.assertEqual(copied, [os.path.join(self.docs, "index.css")])
+        self.assertEqual(self.read("index.css"), "body { margin: 0 }")
+
+    def test_failed_rebuild_keeps_watching(self):
+        index = os.path.join(self.content, "index.md")
+        self.write(index, "No heading yet", 1)
+        with self.assertLogs("ssg", "ERROR") as logs:
+            self.assertEqual(self.watcher.rebuild(), ([], [], []))
+        self.assertIn(f"Rebuild of {index} failed", logs.output[0])
+
+        self.write(index, "# Home\n\nFixed.", 2)
+        rendered, _, _ = self.watcher.rebuild()
+        self.assertEqual(rendered, [os.path.join(self.docs, "index.html")])
+        self.assertIn("Fixed.", self.read("index.html"))
+
+    def test_failed_page_does_not_leave_others_stale(self):
+        # blog/post.md renders first, so its failure used to stop index.md
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "No heading yet", 1)
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", 1)
+        with self.assertLogs("ssg", "ERROR"):
+            rendered, _, _ = self.watcher.poll()
+        self.assertEqual(rendered, [os.path.join(self.docs, "index.html")])
+        self.assertEqual(self.read("index.html"), "<h1>Home</h1><div><h1>Home</h1><p>Welcome.</p></div>")
+
+        # The failed page is retried on every poll until it renders
+        with self.assertNoLogs("ssg", "ERROR"):
+            self.assertEqual(self.watcher.poll(), ([], [], []))
+        self.write(post, "# Post\n\nFixed.", 2)
+        rendered, _, _ = self.watcher.poll()
+        self.assertEqual(rendered, [os.path.join(self.docs, "blog", "post.html")])
+        self.assertEqual(self.read("blog", "post.html"), "<h1>Post</h1><div><h1>Post</h1><p>Fixed.</p></div>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 from enum import Enum
 
 from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TextType(Enum):
     TEXT = "text"
@@ -10,33 +11,135 @@ class TextType(Enum):
     LINK = "link"
     IMAGE = "image"
 
+# TextNode.text_type holds one of these interned strings. Hot code compares
+# against these module constants instead of TextType.X.value, which goes
+# through the Enum descriptor machinery on every access.
+TEXT = TextType.TEXT.value
+BOLD = TextType.BOLD.value
+ITALIC = TextType.ITALIC.value
+CODE = TextType.CODE.value
+LINK = TextType.LINK.value
+IMAGE = TextType.IMAGE.value
+
 class TextNode():
-    def __init__(self, text, text_type, url=None):
+    __slots__ = ("text", "text_type", "url", "children")
+
+    def __init__(self, text, text_type, url=None, children=None):
         self.text = text
-        self.text_type = text_type.value
+        # A TextType, or one of the type code strings above
+        self.text_type = text_type if text_type.__class__ is str else text_type.value
         self.url = url
+        # For a nested span like **a _b_**: its content as a list of nodes
+        # instead of text
+        self.children = children
 
     def __eq__(self, other):
         return (
             self.text == other.text 
             and self.text_type == other.text_type 
             and self.url == other.url
+            and self.children == other.children
         )
     
+    def html_parts(self):
+        # Inline parsing leaves TextNodes as ParentNode children; they
+        # render as the node they convert to.
+        return text_node_to_html_node(self).html_parts()
+
     def __repr__(self):
+        if self.children is not None:
+            return f"TextNode({self.text}, {self.text_type}, {self.url}, {self.children})"
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
     
+def span_html_node(tag, text_node, props=None):
+    """
+    Returns the html node for a span TextNode: a LeafNode of its text, or
+    a ParentNode of its children when it is a nested span. Renderers for
+    span types can use it to handle both.
+    """
+    if text_node.children is not None:
+        return ParentNode(tag, text_node.children, props)
+    return LeafNode(tag, text_node.text, props)
+    
+# Text type code -> function turning a TextNode into its html node
+TEXT_RENDERERS = {
+    TEXT: lambda text_node: LeafNode(None, text_node.text),
+    BOLD: lambda text_node: span_html_node("b", text_node),
+    ITALIC: lambda text_node: span_html_node("i", text_node),
+    CODE: lambda text_node: LeafNode("code", text_node.text),
+    LINK: lambda text_node: span_html_node("a", text_node, {"href": text_node.url}),
+    IMAGE: lambda text_node: LeafNode("img", "", {"src": text_node.url, "alt": text_node.text}),
+}
+DEFAULT_TEXT_RENDERERS = dict(TEXT_RENDERERS)
+
+def uses_default_renderers():
+    """
+    Whether TEXT_RENDERERS still holds exactly the built-in renderers.
+    ParseCache only stores html built by those, since nothing stable
+    identifies a custom renderer across runs.
+    """
+    return TEXT_RENDERERS == DEFAULT_TEXT_RENDERERS
+
+def register_text_renderer(text_type, renderer):
+    """
+    Makes TextNodes of text_type convert through renderer.
+
+    Renderers run when TextNodes are lowered, which parsing does once per
+    page, so a custom renderer costs nothing when the tree is rendered.
+    Trees lowered before registering keep their old nodes.
+
+    While any custom renderer is registered, --parse-cache is bypassed.
+
+    Bold, italic and link spans that contain other spans arrive as a
+    TextNode whose children are their content, already converted to html
+    nodes; see span_html_node.
+
+    Args:
+        text_type: a TextType or type code string, existing or new
+        renderer: function taking a TextNode and returning an HTMLNode
+    """
+    TEXT_RENDERERS[text_type if text_type.__class__ is str else text_type.value] = renderer
+
 def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT.value:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD.value:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC.value:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE.value:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK.value:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE.value:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    raise Exception("Unsupported text type")
\ No newline at end of file
+    renderer = TEXT_RENDERERS.get(text_node.text_type)
+    if renderer is None:
+        raise Exception("Unsupported text type")
+    return renderer(text_node)
+
+def lower_text_nodes(nodes):
+    """
+    Converts TextNodes to their html nodes, descending into the children
+    of html nodes so TextNodes nested in ParentNodes are converted too.
+    Those children lists are updated in place. A nested span's children
+    are converted before its own renderer runs.
+
+    Args:
+        nodes: a list of TextNodes and HTMLNodes
+
+    Returns:
+        A new list with every TextNode replaced
+    """
+    renderers = TEXT_RENDERERS
+    lowered = list(nodes)
+    pending = [lowered]
+    # (children list, index) of nested spans, outer ones first
+    spans = []
+    while pending:
+        children = pending.pop()
+        for i, child in enumerate(children):
+            if isinstance(child, TextNode):
+                if child.children is not None:
+                    spans.append((children, i))
+                    pending.append(child.children)
+                    continue
+                renderer = renderers.get(child.text_type)
+                if renderer is None:
+                    raise Exception("Unsupported text type")
+                # Not descended into: a renderer may wrap the TextNode itself
+                children[i] = renderer(child)
+            elif child.children:
+                pending.append(child.children)
+    # Inner spans are rendered before the spans containing them
+    for children, i in reversed(spans):
+        children[i] = text_node_to_html_node(children[i])
+    return lowered
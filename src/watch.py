@@ -0,0 +1,185 @@
+import os, time
+
+from log import logger
+from pages import discover_pages, write_page
+from parse import markdown_to_html_node, extract_title
+from sync import list_files, copy_file, remove_empty_dirs
+from template import load_template
+
+def scan_tree(root):
+    """
+    Returns a dict of path -> (mtime_ns, size) for every file below root.
+    """
+    if not os.path.isdir(root):
+        return {}
+    return {
+        os.path.join(root, rel_path): (stat.st_mtime_ns, stat.st_size)
+        for rel_path, stat in list_files(root).items()
+    }
+
+class SiteWatcher():
+    """
+    Polls the content, static and template sources and rebuilds only the
+    outputs that depend on what changed.
+
+    The dependency graph maps every source file to its output: content
+    pages to their html file, static files to their copy in dest_dir, and
+    the template to every page. Each page's parsed title and body html are
+    kept in memory, so a template edit re-renders pages without parsing
+    any markdown.
+    """
+    def __init__(self, basepath, content_dir, static_dir, template_path, dest_dir, interval=0.25):
+        self.basepath = basepath
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.interval = interval
+
+        self.pages = {}   # content source -> html output
+        self.assets = {}  # static source -> copied output
+        self.bodies = {}  # content source -> (title, body html)
+        self.state = {}   # source -> (mtime_ns, size) at the last sweep
+        self.failures = {}  # source -> error of its last failed rebuild
+
+    def snapshot(self):
+        state = scan_tree(self.content_dir)
+        state.update(scan_tree(self.static_dir))
+        try:
+            stat = os.stat(self.template_path)
+            state[self.template_path] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return state
+
+    def refresh_graph(self):
+        self.pages = dict(discover_pages(self.content_dir, self.dest_dir))
+        self.assets = {
+            os.path.join(self.static_dir, rel_path): os.path.join(self.dest_dir, rel_path)
+            for rel_path in (list_files(self.static_dir) if os.path.isdir(self.static_dir) else {})
+        }
+
+    def start(self):
+        """
+        Renders every page once, priming the in-memory parse state.
+        """
+        self.state = self.snapshot()
+        self.refresh_graph()
+        for src_path in self.pages:
+            self.render_page(src_path, reparse=True)
+        logger.info(f"Watching '{self.content_dir}', '{self.static_dir}' and '{self.template_path}' for changes...")
+
+    def render_page(self, src_path, reparse):
+        if reparse or src_path not in self.bodies:
+            with open(src_path) as f:
+                source_md = f.read()
+            self.bodies[src_path] = (
+                extract_title(source_md),
+                markdown_to_html_node(source_md).to_html(),
+            )
+        html_title, html_content = self.bodies[src_path]
+        template = load_template(self.template_path, self.basepath)
+        write_page(template.render(Title=html_title, Content=html_content), self.pages[src_path])
+
+    def remove_output(self, dest_path):
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), self.dest_dir)
+
+    def poll(self):
+        """
+        Takes one stat sweep and rebuilds whatever changed since the last.
+        A source that fails to rebuild doesn't stop the others, and stays
+        due until it succeeds (see record_failure).
+
+        Returns:
+            A tuple (rendered, copied, removed) of output path lists.
+        """
+        new_state = self.snapshot()
+        changed = {path for path, sig in new_state.items() if self.state.get(path) != sig}
+        deleted = set(self.state) - set(new_state)
+        self.state = new_state
+        if not changed and not deleted:
+            return [], [], []
+
+        old_pages, old_assets = self.pages, self.assets
+        added = changed - set(old_pages) - set(old_assets) - {self.template_path}
+        if added or deleted:
+            # Files were added or removed, so the source -> output mapping moved
+            self.refresh_graph()
+
+        removed = []
+        for src_path in sorted(deleted):
+            dest_path = old_pages.get(src_path) or old_assets.get(src_path)
+            self.bodies.pop(src_path, None)
+            if dest_path and dest_path not in self.pages.values() and dest_path not in self.assets.values():
+                self.remove_output(dest_path)
+                removed.append(dest_path)
+
+        template_changed = self.template_path in changed
+        rendered = []
+        for src_path in sorted(self.pages):
+            if src_path in changed or template_changed:
+                try:
+                    self.render_page(src_path, reparse=src_path in changed)
+                except Exception as e:
+                    self.record_failure(src_path, e)
+                    continue
+                self.failures.pop(src_path, None)
+                rendered.append(self.pages[src_path])
+
+        copied = []
+        for src_path in sorted(changed & set(self.assets)):
+            dest_path = self.assets[src_path]
+            try:
+                os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+                copy_file(src_path, dest_path, new_state[src_path][1])
+            except OSError as e:
+                self.record_failure(src_path, e)
+                continue
+            self.failures.pop(src_path, None)
+            copied.append(dest_path)
+
+        for src_path in deleted:
+            self.failures.pop(src_path, None)
+        return rendered, copied, removed
+
+    def record_failure(self, src_path, error):
+        """
+        Logs a source that failed to rebuild and forgets its state, so the
+        next poll retries it; the same error is only logged once.
+        """
+        message = f"{type(error).__name__}: {error}"
+        if self.failures.get(src_path) != message:
+            logger.error(f"Rebuild of {src_path} failed: {message}")
+        self.failures[src_path] = message
+        self.state.pop(src_path, None)
+
+    def rebuild(self):
+        """
+        Runs one poll and logs what it rebuilt. Pages that fail to render
+        are logged and retried by poll; any other error is logged instead
+        of raised, since it is usually a file caught mid-edit.
+
+        Returns:
+            poll's (rendered, copied, removed) tuple, or None if it failed.
+        """
+        start = time.perf_counter()
+        try:
+            rendered, copied, removed = self.poll()
+        except Exception as e:
+            # Keep watching; the next save will usually fix it
+            logger.error(f"Rebuild failed: {type(e).__name__}: {e}")
+            return None
+        if rendered or copied or removed:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"Rebuilt {len(rendered)} pages, copied {len(copied)} files, removed {len(removed)} in {elapsed_ms:.1f}ms")
+        return rendered, copied, removed
+
+    def run(self):
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.rebuild()
+        except KeyboardInterrupt:
+            logger.info("Stopped watching.")